@@ -6,19 +6,40 @@ Cross-platform Python CLI for git_diff_rag, replacing bash scripts.
 
 import sys
 import argparse
+import functools
 from pathlib import Path
 from typing import Optional
 
-# Add project root to path
+# Project root. No sys.path manipulation needed: running `python cli.py`
+# already puts this directory first on sys.path, and importing `cli`
+# requires it to be importable in the first place.
 PROJECT_ROOT = Path(__file__).parent
-sys.path.insert(0, str(PROJECT_ROOT))
 
-from scripts.orchestrator import run_workflow, WorkflowConfig, WorkflowError
-from scripts import call_copilot_cli, call_gemini, config_utils
 import logging
 
 logger = logging.getLogger(__name__)
 
+# LLM providers selectable via --llm (keys of llm_strategy.PROVIDERS)
+LLM_CHOICES = ('gemini', 'gemini-cli', 'gh-copilot', 'copilot')
+
+SEPARATOR = '=' * 60
+SEPARATOR_WIDE = '=' * 80
+
+_INFO_FORMATTER = logging.Formatter('%(message)s')
+_DEBUG_FORMATTER = logging.Formatter('[%(levelname)s] %(message)s')
+_log_handler: Optional[logging.Handler] = None
+
+
+def _setup_logging(debug: bool) -> None:
+    """Attach the CLI's console handler to the root logger (once) and set the level."""
+    global _log_handler
+    root = logging.getLogger()
+    if _log_handler is None:
+        _log_handler = logging.StreamHandler()
+        root.addHandler(_log_handler)
+    _log_handler.setFormatter(_DEBUG_FORMATTER if debug else _INFO_FORMATTER)
+    root.setLevel(logging.DEBUG if debug else logging.INFO)
+
 
 def cmd_analyze(args: argparse.Namespace) -> int:
     """Execute analysis workflow.
@@ -26,10 +47,10 @@ def cmd_analyze(args: argparse.Namespace) -> int:
     Returns:
         Exit code (0 for success, 1 for error)
     """
-    if args.debug:
-        logging.basicConfig(level=logging.DEBUG, format='[%(levelname)s] %(message)s')
-    else:
-        logging.basicConfig(level=logging.INFO, format='%(message)s')
+    _setup_logging(args.debug)
+    
+    # Deferred: the orchestrator pulls in jinja2, yaml and the LLM clients
+    from scripts.orchestrator import run_workflow, WorkflowConfig, WorkflowError
     
     wf_config = WorkflowConfig(
         repo_name=args.repo,
@@ -49,24 +70,24 @@ def cmd_analyze(args: argparse.Namespace) -> int:
         result = run_workflow(wf_config)
         
         if result['success']:
-            print(f"\n{'=' * 80}")
-            print("✅ Workflow Completed Successfully")
-            print(f"{'=' * 80}")
+            lines = ["", SEPARATOR_WIDE, "✅ Workflow Completed Successfully", SEPARATOR_WIDE]
             
             if result.get('output_dir'):
-                print(f"📂 Artifacts: {result['output_dir']}")
+                lines.append(f"📂 Artifacts: {result['output_dir']}")
             
             if result.get('dry_run'):
-                print(f"📊 Estimated tokens: ~{result.get('estimated_tokens', 0)}")
-                print(f"\n👉 Review prompt and run without --dry-run to execute")
+                lines.append(f"📊 Estimated tokens: ~{result.get('estimated_tokens', 0)}")
+                lines.append("\n👉 Review prompt and run without --dry-run to execute")
             elif result.get('message'):
-                print(f"ℹ️  {result['message']}")
+                lines.append(f"ℹ️  {result['message']}")
             else:
                 if result.get('cached'):
-                    print("⚡ Result from cache")
-                print(f"\n👉 Review results in: {result['output_dir']}")
+                    lines.append("⚡ Result from cache")
+                lines.append(f"\n👉 Review results in: {result['output_dir']}")
             
-            print(f"{'=' * 80}\n")
+            lines.append(SEPARATOR_WIDE + "\n")
+            # Emit the whole banner in one print call
+            print("\n".join(lines))
             return 0
         
         return 1
@@ -78,7 +99,7 @@ def cmd_analyze(args: argparse.Namespace) -> int:
         print("\n\n⚠️  Interrupted by user", file=sys.stderr)
         return 130
     except Exception as e:
-        print(f"\n❌ Unexpected error: {e}", file=sys.stderr)
+        sys.stderr.write(f"\n❌ Unexpected error: {e}\n")
         if args.debug:
             import traceback
             traceback.print_exc()
@@ -102,6 +123,8 @@ def cmd_list_models(args: argparse.Namespace) -> int:
     Returns:
         Exit code
     """
+    from scripts import call_copilot_cli, call_gemini
+    
     print("Available Models by Provider:\n")
     
     # Gemini models
@@ -159,31 +182,72 @@ def cmd_list_models(args: argparse.Namespace) -> int:
     return 0
 
 
+@functools.lru_cache(maxsize=1)
+def _git_version() -> Optional["subprocess.CompletedProcess"]:
+    """Run `git --version`, or return None if git could not be run at all.
+    
+    A non-zero exit is returned as is, so the caller can tell a broken git
+    from a missing one. Cached so repeated diagnostics in one process spawn
+    git only once.
+    """
+    import subprocess
+    try:
+        return subprocess.run(['git', '--version'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _prewarm_probes() -> None:
+    """Run the slow, memoized tool probes concurrently before they are reported.
+    
+    Each probe spawns a subprocess with a 5-10 s timeout; run one after
+    another, the setup check waited for their sum instead of the slowest.
+    Failures are ignored here: the report calls each probe again and
+    handles the error itself.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from scripts import call_copilot_cli
+    
+    probes = [_git_version, call_copilot_cli.check_authentication]  # auth also probes the install
+    try:
+        from scripts import call_gemini_cli
+        probes.append(call_gemini_cli.is_gemini_cli_installed)
+    except Exception:
+        pass  # Reported by the Gemini CLI section
+    
+    # Leaving the block waits for every probe, so the report only reads cached results
+    with ThreadPoolExecutor(max_workers=len(probes)) as pool:
+        for probe in probes:
+            pool.submit(probe)
+
+
 def cmd_check_setup(args: argparse.Namespace) -> int:
     """Check installation and authentication status.
     
     Returns:
         Exit code
     """
+    from scripts import call_copilot_cli
+    
+    _prewarm_probes()
+    
     print("Git Diff RAG - Setup Check\n")
-    print("=" * 60)
+    print(SEPARATOR)
     
     all_ok = True
     
     # Check Git
     print("\n📦 Git:")
-    import subprocess
-    try:
-        result = subprocess.run(['git', '--version'], capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            version = result.stdout.strip()
-            print(f"  ✓ Installed: {version}")
-        else:
-            print(f"  ✗ Error checking git")
-            all_ok = False
-    except:
+    result = _git_version()
+    if result is None:
         print(f"  ✗ Not installed or not in PATH")
         all_ok = False
+    elif result.returncode == 0:
+        version = result.stdout.strip()
+        print(f"  ✓ Installed: {version}")
+    else:
+        print(f"  ✗ Error checking git")
+        all_ok = False
     
     # Check Python dependencies
     print("\n🐍 Python Dependencies:")
@@ -194,11 +258,17 @@ def cmd_check_setup(args: argparse.Namespace) -> int:
         'streamlit': ('streamlit', 'Web UI (optional)')
     }
     
+    # find_spec only consults the import finders; it doesn't execute the
+    # (potentially heavy) package, e.g. streamlit or google.genai
+    import importlib.util
     for package, (import_name, description) in dependencies.items():
         try:
-            __import__(import_name)
+            installed = importlib.util.find_spec(import_name) is not None
+        except ImportError:  # parent package missing (e.g. 'google')
+            installed = False
+        if installed:
             print(f"  ✓ {package}: {description}")
-        except ImportError:
+        else:
             print(f"  ✗ {package}: {description} - Not installed")
             if package != 'streamlit':  # streamlit is optional
                 all_ok = False
@@ -209,6 +279,7 @@ def cmd_check_setup(args: argparse.Namespace) -> int:
     if os.getenv('GEMINI_API_KEY'):
         print(f"  ✓ GEMINI_API_KEY is set")
         try:
+            from scripts import call_gemini
             call_gemini.get_client()
             print(f"  ✓ API client initialized successfully")
         except Exception as e:
@@ -259,7 +330,7 @@ def cmd_check_setup(args: argparse.Namespace) -> int:
         print(f"  ⚠️  No clipboard tool found (manual mode will require file copy)")
     
     # Summary
-    print("\n" + "=" * 60)
+    print("\n" + SEPARATOR)
     if all_ok:
         print("✅ All required components are properly configured!")
     else:
@@ -275,7 +346,7 @@ def cmd_list_repos(args: argparse.Namespace) -> int:
     Returns:
         Exit code
     """
-    from scripts import ui_utils
+    from scripts import config_utils, ui_utils
     
     repos = ui_utils.list_repositories()
     
@@ -301,8 +372,98 @@ def cmd_list_repos(args: argparse.Namespace) -> int:
     return 0
 
 
-def main():
-    """Main CLI entry point."""
+def _add_diff_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments shared by the diff-analysing commands (analyze, explain)."""
+    parser.add_argument('--repo', required=True, help='Repository name')
+    parser.add_argument('--target', help='Target ref for diff (base)')
+    parser.add_argument('--source', help='Source ref for diff (tip)')
+    parser.add_argument('--commit', help='Analyze specific commit')
+    parser.add_argument('--llm', choices=LLM_CHOICES,
+                        help='LLM provider to use (overrides config)')
+    parser.add_argument('--model', help='Specific model to use (provider-dependent)')
+    parser.add_argument('--dry-run', '-n', action='store_true', help='Validate without calling LLM')
+    parser.add_argument('--debug', action='store_true', help='Enable debug output')
+
+
+# Subcommand name -> handler
+COMMANDS = {
+    'analyze': cmd_analyze,
+    'explain': cmd_explain,
+    'list-models': cmd_list_models,
+    'check-setup': cmd_check_setup,
+    'list-repos': cmd_list_repos,
+}
+
+
+def _add_analyze_parser(subparsers) -> None:
+    """Add the 'analyze' subcommand."""
+    analyze_parser = subparsers.add_parser(
+        'analyze',
+        help='Analyze git diff with AI',
+        description='Execute an analysis workflow on a git diff'
+    )
+    _add_diff_arguments(analyze_parser)
+    analyze_parser.add_argument('--workflow', help='Workflow to execute (default from config)')
+    analyze_parser.add_argument('--language', help='Force specific language context')
+    analyze_parser.add_argument('--output-format', '-o', choices=['markdown', 'json'], default='markdown')
+
+
+def _add_explain_parser(subparsers) -> None:
+    """Add the 'explain' subcommand (convenience wrapper for explain_diff)."""
+    explain_parser = subparsers.add_parser(
+        'explain',
+        help='Explain changes in plain language',
+        description='Convenience wrapper for explain_diff workflow'
+    )
+    _add_diff_arguments(explain_parser)
+    explain_parser.set_defaults(workflow='explain_diff', output_format='markdown', language=None)
+
+
+def _add_list_models_parser(subparsers) -> None:
+    """Add the 'list-models' subcommand."""
+    subparsers.add_parser(
+        'list-models',
+        help='List available AI models',
+        description='Show available models for each LLM provider'
+    )
+
+
+def _add_check_setup_parser(subparsers) -> None:
+    """Add the 'check-setup' subcommand."""
+    subparsers.add_parser(
+        'check-setup',
+        help='Verify installation and configuration',
+        description='Check that all dependencies and credentials are properly configured'
+    )
+
+
+def _add_list_repos_parser(subparsers) -> None:
+    """Add the 'list-repos' subcommand."""
+    subparsers.add_parser(
+        'list-repos',
+        help='List configured repositories',
+        description='Show all repositories configured in repository-setup/'
+    )
+
+
+# Subcommand name -> subparser builder (same order as COMMANDS for help output)
+SUBPARSER_BUILDERS = {
+    'analyze': _add_analyze_parser,
+    'explain': _add_explain_parser,
+    'list-models': _add_list_models_parser,
+    'check-setup': _add_check_setup_parser,
+    'list-repos': _add_list_repos_parser,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _build_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """Build the CLI argument parser (memoized per command).
+    
+    Args:
+        command: Subcommand about to be parsed. If it is known, only that
+            subparser is constructed; otherwise all subparsers are built.
+    """
     parser = argparse.ArgumentParser(
         prog='git-diff-rag',
         description='Git Diff RAG - AI-powered code review and analysis',
@@ -333,66 +494,20 @@ For more information: https://github.com/your-org/git_diff_rag
     
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
     
-    # Analyze command
-    analyze_parser = subparsers.add_parser(
-        'analyze',
-        help='Analyze git diff with AI',
-        description='Execute an analysis workflow on a git diff'
-    )
-    analyze_parser.add_argument('--repo', required=True, help='Repository name')
-    analyze_parser.add_argument('--workflow', help='Workflow to execute (default from config)')
-    analyze_parser.add_argument('--target', help='Target ref for diff (base)')
-    analyze_parser.add_argument('--source', help='Source ref for diff (tip)')
-    analyze_parser.add_argument('--commit', help='Analyze specific commit')
-    analyze_parser.add_argument('--language', help='Force specific language context')
-    analyze_parser.add_argument('--llm', choices=['gemini', 'gemini-cli', 'gh-copilot', 'copilot'], 
-                               help='LLM provider to use (overrides config)')
-    analyze_parser.add_argument('--model', help='Specific model to use (provider-dependent)')
-    analyze_parser.add_argument('--dry-run', '-n', action='store_true', help='Validate without calling LLM')
-    analyze_parser.add_argument('--output-format', '-o', choices=['markdown', 'json'], default='markdown')
-    analyze_parser.add_argument('--debug', action='store_true', help='Enable debug output')
-    analyze_parser.set_defaults(func=cmd_analyze)
-    
-    # Explain command (convenience)
-    explain_parser = subparsers.add_parser(
-        'explain',
-        help='Explain changes in plain language',
-        description='Convenience wrapper for explain_diff workflow'
-    )
-    explain_parser.add_argument('--repo', required=True, help='Repository name')
-    explain_parser.add_argument('--target', help='Target ref for diff')
-    explain_parser.add_argument('--source', help='Source ref for diff')
-    explain_parser.add_argument('--commit', help='Analyze specific commit')
-    explain_parser.add_argument('--llm', choices=['gemini', 'gemini-cli', 'gh-copilot', 'copilot'], 
-                               help='LLM provider to use (overrides config)')
-    explain_parser.add_argument('--model', help='Specific model to use (provider-dependent)')
-    explain_parser.add_argument('--dry-run', '-n', action='store_true', help='Validate without calling LLM')
-    explain_parser.add_argument('--debug', action='store_true', help='Enable debug output')
-    explain_parser.set_defaults(func=cmd_explain, workflow='explain_diff', output_format='markdown', language=None)
-    
-    # List models command
-    models_parser = subparsers.add_parser(
-        'list-models',
-        help='List available AI models',
-        description='Show available models for each LLM provider'
-    )
-    models_parser.set_defaults(func=cmd_list_models)
-    
-    # Check setup command
-    check_parser = subparsers.add_parser(
-        'check-setup',
-        help='Verify installation and configuration',
-        description='Check that all dependencies and credentials are properly configured'
-    )
-    check_parser.set_defaults(func=cmd_check_setup)
+    # Only build the invoked subcommand's parser; fall back to all of them
+    # so top-level help and unknown commands still list every choice
+    if command in SUBPARSER_BUILDERS:
+        SUBPARSER_BUILDERS[command](subparsers)
+    else:
+        for add_subparser in SUBPARSER_BUILDERS.values():
+            add_subparser(subparsers)
     
-    # List repos command
-    repos_parser = subparsers.add_parser(
-        'list-repos',
-        help='List configured repositories',
-        description='Show all repositories configured in repository-setup/'
-    )
-    repos_parser.set_defaults(func=cmd_list_repos)
+    return parser
+
+
+def main():
+    """Main CLI entry point."""
+    parser = _build_parser(sys.argv[1] if len(sys.argv) > 1 else None)
     
     # Parse arguments
     args = parser.parse_args()
@@ -402,7 +517,7 @@ For more information: https://github.com/your-org/git_diff_rag
         return 1
     
     # Execute command
-    return args.func(args)
+    return COMMANDS[args.command](args)
 
 
 if __name__ == '__main__':
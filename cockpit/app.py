@@ -1,33 +1,153 @@
 import time
+import calendar
+import copy
+import itertools
 import os
 import sys
-import sqlite3
 import hashlib
-import subprocess
-import yaml
-import glob
+import gzip
 import streamlit as st
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 # Add root to path for script imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPTS_DIR = os.path.join(REPO_ROOT, "prompts")
+RECIPES_DIR = os.path.join(PROMPTS_DIR, "recipes")
+LIBRARY_DIR = os.path.join(PROMPTS_DIR, "library")
+DEFAULT_RECIPE = os.path.join(RECIPES_DIR, "standard_pr_review.md")
+REPO_SETUP_DIR = os.path.join(REPO_ROOT, "repository-setup")
+OUTPUT_DIR = os.path.join(REPO_ROOT, "output")
+HISTORY_DB_PATH = os.path.join(REPO_ROOT, "data", "history.sqlite")
+LOGO_PATH = os.path.join(REPO_ROOT, "cockpit", "assets", "logo.png")
+CSS_PATH = os.path.join(REPO_ROOT, "cockpit", "assets", "cockpit.css")
+sys.path.append(REPO_ROOT)
 from scripts import ui_utils, config_utils, db_manager
+from scripts.git_operations import get_commits_between
+from scripts.llm_strategy import get_provider
 from cockpit.components import file_tree, diff_viewer
-from streamlit_code_diff import st_code_diff
-from streamlit_monaco import st_monaco
-import streamlit_antd_components as sac
-from scripts.render_prompt import render_template
+from scripts.render_prompt import render_template, bind_output_dir, OUTPUT_DIR_PLACEHOLDER
 
 # Token estimation constants
 TOKEN_THRESHOLD = 100000  # Warn when context exceeds this
 CHARS_PER_TOKEN = 4  # Rough estimate
+AVG_CHARS_PER_LINE = 60  # Per changed line, for estimating diff size from numstat
+
+# AI Provider choices (in selectbox order) -> llm_strategy provider names
+TOOL_PROVIDERS = {
+    "GitHub Copilot CLI": "gh-copilot",
+    "Gemini API": "gemini",
+    "Gemini CLI": "gemini-cli",
+}
+
+# Tool permissions and timeout for the agentic CLI providers
+CLI_AGENT_OPTIONS = {"allow_tools": ['shell(git)', 'write'], "timeout": 300}
+
+# Upper bound on concurrent LLM calls when a bundle has several recipes
+MAX_PARALLEL_CALLS = 4
+
+# Rows per page in the History > Database table
+HISTORY_PAGE_SIZE = 500
+
+# History > File Output shows at most this much of each artifact
+HISTORY_PREVIEW_BYTES = 200_000
+
+# Commit search shows at most this many matches per keystroke
+MAX_COMMIT_RESULTS = 200
+
+# Prompt/diff artifacts at least this large are stored gzip-compressed (*.gz)
+ARTIFACT_GZIP_BYTES = 1 << 20
+
+# Summarization prompts (content is truncated to the matching *_CHARS limit)
+DIFF_SUMMARY_CHARS = 50000
+COMMITS_SUMMARY_CHARS = 20000
+DIFF_SUMMARY_PROMPT = """Summarize this git diff into a concise overview (max 2000 chars).
+Focus on: what files changed, key modifications, and overall intent.
+
+```diff
+{content}
+```
+
+Provide a structured summary:
+1. Files Changed (bullet list)
+2. Key Modifications (grouped by area)
+3. Overall Intent (1-2 sentences)"""
+COMMITS_SUMMARY_PROMPT = """Summarize these commit messages into a coherent narrative (max 1000 chars).
+Focus on: the progression of work, key milestones, and overall direction.
+
+{content}
+
+Provide a narrative summary capturing the developer's journey."""
+
+# Session state keys and their initial values
+SESSION_DEFAULTS = {
+    'repo': None,
+    'target': "main",
+    'source': "HEAD",
+    'target_commit': None,
+    'source_commit': None,
+    'active_bundle': [],
+    'selected_file': None,
+    'force_render': set(),  # Files the user chose to diff despite their size
+    'agent_active': False,
+    'is_executing': False,
+    'current_step': None,
+    'completed_steps': [],
+    'execution_times': {},
+    'show_advanced': False,
+    'setup_complete': False,
+    'execution_result': None,
+    'run_state': None,  # Outputs of the in-flight review, kept if a rerun interrupts it
+    'show_results': False,
+    'tool_choice': "GitHub Copilot CLI",
+    'model_choice': "gpt-4",
+    # Summarization state
+    'use_summarized': False,
+    'summarized_diff': None,
+    'summarized_commits': None,
+    'commit_search': "",
+}
+
+# Execution Plan card for one recipe (kept unindented so markdown treats it as HTML)
+RECIPE_CARD_HTML = """<div style="background: #161b22; border: 1px solid #30363d; border-radius: 6px; padding: 12px; margin-bottom: 8px; display: flex; flex-direction: column;">
+<div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 4px;">
+<span style="font-weight: 600; color: #58a6ff;">{index}. {name}</span>
+<span style="font-size: 0.8em; color: #8b949e; font-family: monospace;">{tag_count} tags</span>
+</div>
+<div style="font-size: 0.9em; color: #c9d1d9; margin-bottom: 8px;">{desc}</div>
+<div>{tags_html}</div>
+</div>
+"""
 
 def estimate_tokens(text: str) -> int:
     """Rough token estimate based on character count."""
     return len(text) // CHARS_PER_TOKEN if text else 0
 
+@st.cache_resource(show_spinner=False)
+def llm_provider(provider_name):
+    """Shared provider instance per llm_strategy provider name."""
+    return get_provider(provider_name)
+
+@st.cache_data(ttl=3600, max_entries=4, show_spinner=False)
+def cached_model_list(provider_name):
+    """Models offered by a provider, shared by all sessions for an hour."""
+    models = llm_provider(provider_name).list_models()
+    if not models:
+        raise RuntimeError(f"No models listed for {provider_name}")  # Not cached; retried next time
+    return models
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _summarize(content_hash: str, content_type: str, _content: str) -> str:
+    """Call Gemini for a summary; cached by content hash (the content itself is not hashed again)."""
+    template = DIFF_SUMMARY_PROMPT if content_type == "diff" else COMMITS_SUMMARY_PROMPT
+    prompt = template.format_map({'content': _content})
+    return llm_provider("gemini").call(prompt, model="gemini-2.0-flash-exp")
+
 def summarize_with_gemini(content: str, content_type: str = "diff") -> str:
     """Use Gemini API to summarize large content for context optimization.
     
+    Identical content is only summarized once per hour; failures are not cached.
+
     Args:
         content: The content to summarize (diff or commit history)
         content_type: Either 'diff' or 'commits'
@@ -36,32 +156,275 @@ def summarize_with_gemini(content: str, content_type: str = "diff") -> str:
         Summarized content string
     """
     try:
-        from scripts.llm_strategy import get_provider
-        provider = get_provider("gemini")
-        
-        if content_type == "diff":
-            prompt = f"""Summarize this git diff into a concise overview (max 2000 chars).
-Focus on: what files changed, key modifications, and overall intent.
+        limit = DIFF_SUMMARY_CHARS if content_type == "diff" else COMMITS_SUMMARY_CHARS
+        # Only the prompt-sized prefix matters; slice (and hash) just that
+        if len(content) > limit:
+            content = content[:limit]
+        content_hash = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+        return _summarize(content_hash, content_type, content)
+    except Exception as e:
+        return f"[Summarization failed: {str(e)}]"
 
-```diff
-{content[:50000]}
-```
+def with_diff_fallback(prompt: str, diff_content: str, has_placeholder: bool = None) -> str:
+    """Append the diff to a rendered prompt that does not appear to include it.
 
-Provide a structured summary:
-1. Files Changed (bullet list)
-2. Key Modifications (grouped by area)
-3. Overall Intent (1-2 sentences)"""
-        else:  # commit history
-            prompt = f"""Summarize these commit messages into a coherent narrative (max 1000 chars).
-Focus on: the progression of work, key milestones, and overall direction.
+    Pass has_placeholder when already known to skip rescanning the prompt.
+    """
+    if has_placeholder is None:
+        has_placeholder = "{{ DIFF_CONTENT }}" in prompt
+    # Lower-case only the 200 chars we look at, not the whole prompt
+    if not has_placeholder and "diff" not in prompt[:200].lower():
+        prompt += f"\n\n## DIFF\n\n```diff\n{diff_content}\n```"
+    return prompt
 
-{content[:20000]}
+def write_artifact(path: str, data: bytes) -> None:
+    """Write a run artifact in one buffered call (safe to run in a worker thread).
 
-Provide a narrative summary capturing the developer's journey."""
-        
-        return provider.call(prompt, model="gemini-2.0-flash-exp")
-    except Exception as e:
-        return f"[Summarization failed: {str(e)}]"
+    Large artifacts go to ``path + ".gz"`` so big diffs don't pile up on disk.
+    The data lands in a ``.tmp`` sibling first and is renamed into place, so a
+    half-written artifact is never visible to the History tab.
+    """
+    if len(data) >= ARTIFACT_GZIP_BYTES:
+        data = gzip.compress(data, compresslevel=6)
+        path += ".gz"
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb", buffering=1 << 20) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def call_provider(provider, provider_name: str, prompt: str, model: str) -> str:
+    """Send one prompt to an LLM provider with the cockpit's per-provider options.
+
+    Must not touch st.* since it also runs in worker threads.
+    """
+    if provider_name == "gh-copilot":
+        return provider.call(prompt, **CLI_AGENT_OPTIONS)
+    elif provider_name == "gemini-cli":
+        return provider.call(prompt, model=model, **CLI_AGENT_OPTIONS)
+    return provider.call(prompt, model=model)
+
+# --- Cached git lookups ---
+# Streamlit reruns the whole script on every interaction. These wrappers turn
+# the repeated git subprocess calls into cache hits; `repo_state` (see
+# ui_utils.get_repo_state) is part of each key, so new commits or
+# working-tree edits invalidate them. The branch list is read before any ref
+# is selected, so it is keyed on `refs_state` (ui_utils.get_refs_state) instead.
+@st.cache_data(ttl=10, show_spinner=False)
+def cached_is_git_repo(repo_path):
+    return ui_utils.is_git_repo(repo_path)
+
+# The TTL is a backstop for repos whose refs can't be fingerprinted (worktrees)
+@st.cache_data(ttl=60, max_entries=16, show_spinner=False)
+def cached_branches(repo_path, refs_state):
+    return ui_utils.get_branches(repo_path)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_commits(repo_path, ref, repo_state):
+    return ui_utils.get_commits(repo_path, ref)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_smart_refs(repo_path, target, source, target_commit, source_commit, repo_state):
+    return ui_utils.get_smart_refs(repo_path, target, source, target_commit, source_commit)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_changed_files(repo_path, target, source, target_commit, source_commit, repo_state):
+    return ui_utils.get_changed_files(repo_path, target, source, target_commit, source_commit)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_diff(repo_path, target, source, target_commit, source_commit, repo_state):
+    return ui_utils.get_diff(repo_path, target, source, target_commit=target_commit, source_commit=source_commit)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_diff_numstat(repo_path, target, source, target_commit, source_commit, repo_state):
+    return ui_utils.get_diff_numstat(repo_path, target, source, target_commit=target_commit, source_commit=source_commit)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_commits_between(repo_path, target, source, repo_state):
+    return get_commits_between(repo_path, target, source, tier1_limit=10, tier2_limit=50)
+
+@st.cache_resource(show_spinner=False)
+def cockpit_css():
+    """Read the cockpit stylesheet once per process, wrapped for st.markdown."""
+    with open(CSS_PATH, 'r', encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
+
+# --- Cached filesystem probes ---
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_path_exists(path):
+    return os.path.exists(path)
+
+def prompts_dir_state():
+    """Fingerprint of the prompts tree: the mtime of every directory in it.
+
+    Adding, removing or renaming a prompt bumps its directory's mtime, so this
+    is enough to invalidate the library listing without reading any files.
+    """
+    return tuple(os.stat(root).st_mtime_ns for root, _, _ in os.walk(PROMPTS_DIR))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_prompt_library(prompts_state):
+    return ui_utils.list_prompt_library()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_md_files(target_dir, prompts_state):
+    """Sorted paths (relative to target_dir) of every .md file under it."""
+    files = []
+    for root, _, filenames in os.walk(target_dir):
+        for filename in filenames:
+            if filename.endswith(".md"):
+                files.append(os.path.relpath(os.path.join(root, filename), target_dir))
+    return sorted(files)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_prompt_labels(prompts_state):
+    """Map a unique display label to each prompt library path (macros excluded)."""
+    library = cached_prompt_library(prompts_state)
+
+    tree_data = {}
+    for item in library:
+        folder = os.path.dirname(item['name']) or "root"
+        if "macros" in folder: continue
+        tree_data.setdefault(folder, []).append(item)
+
+    folder_order = ['recipes', 'library', 'root']
+    sorted_folders = sorted(tree_data.keys(), key=lambda x: folder_order.index(x) if x in folder_order else 99)
+
+    # Duplicate basenames get a " (n)" suffix after the first occurrence
+    counts = Counter(os.path.basename(item['name']) for items in tree_data.values() for item in items)
+    seen = defaultdict(int)
+
+    label_map = {}
+    for folder in sorted_folders:
+        for item in tree_data[folder]:
+            base_label = os.path.basename(item['name'])
+            label = base_label
+            if counts[base_label] > 1:
+                if seen[base_label]:
+                    label = f"{base_label} ({seen[base_label]})"
+                seen[base_label] += 1
+
+            label_map[label] = item['full_path']
+    return label_map
+
+@st.cache_resource(show_spinner=False)
+def history_db(db_path):
+    """One shared read connection to the history DB per server process."""
+    import sqlite3
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")  # Readers no longer block the review writer
+    return conn
+
+def history_db_state(db_path):
+    """mtimes of the history DB and its WAL file; new rows touch one or the other."""
+    return tuple(dir_mtime(path) for path in (db_path, db_path + "-wal"))
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_history_count(db_path, db_state):
+    return history_db(db_path).execute("SELECT COUNT(*) FROM analysis_history").fetchone()[0]
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_history_page(db_path, page, db_state):
+    import pandas as pd
+    return pd.read_sql_query(
+        "SELECT id, timestamp, repo_name, model, cost, summary, tags FROM analysis_history "
+        "ORDER BY id DESC LIMIT ? OFFSET ?",
+        history_db(db_path), params=(HISTORY_PAGE_SIZE, (page - 1) * HISTORY_PAGE_SIZE)
+    ).astype({"repo_name": "category", "model": "category", "tags": "category"})  # Few distinct values
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_settings_file(path, mtime):
+    """Front matter and body of a repository-setup file (re-parsed when it changes)."""
+    with open(path, "r") as f:
+        return config_utils.split_front_matter(f.read())
+
+# --- History tab listings, keyed on directory/file mtimes ---
+def dir_mtime(path):
+    """Return the path's mtime in ns, or None if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_list_runs(output_dir, mtime):
+    """Run folders under output/, newest first."""
+    with os.scandir(output_dir) as entries:
+        return sorted((e.name for e in entries if e.is_dir()), reverse=True)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_list_run_files(run_path, mtime):
+    with os.scandir(run_path) as entries:
+        # Skip artifacts still being written by write_artifact
+        return sorted(e.name for e in entries if e.is_file() and not e.name.endswith(".tmp"))
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_md_names(directory, mtime):
+    """Sorted names (without .md) of the markdown files directly in directory."""
+    with os.scandir(directory) as entries:
+        return sorted(e.name[:-3] for e in entries if e.name.endswith(".md") and e.is_file())
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_repositories(mtime):
+    # list_repositories reads repository-setup/ relative to the working directory
+    return ui_utils.list_repositories()
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_read_text(path, mtime):
+    """Text of a run artifact, cut at HISTORY_PREVIEW_BYTES; returns (text, truncated).
+
+    Only the shown prefix is read (or decompressed for .gz), however big the file is.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        data = f.read(HISTORY_PREVIEW_BYTES + 1)
+    truncated = len(data) > HISTORY_PREVIEW_BYTES
+    return data[:HISTORY_PREVIEW_BYTES].decode("utf-8", "replace"), truncated
+
+def format_commit_option(commit: dict) -> str:
+    """Format commit for dropdown: 'abc1234 • Dec 23 • @author • Fix login bug'"""
+    short_hash = commit['hash'][:7]
+    date_str = commit.get('date', '').split()[0] if commit.get('date') else ''
+    try:
+        # Dates come from `git log --date=short` (YYYY-MM-DD)
+        _, month, day = date_str.split('-')
+        date_display = f"{calendar.month_abbr[int(month)]} {day}"
+    except (ValueError, IndexError):
+        date_display = date_str[:10] if date_str else '?'
+    author = commit.get('author', 'unknown').split()[0][:10]
+    subject = commit.get('message', '')[:35]
+    if len(commit.get('message', '')) > 35:
+        subject += '...'
+    return f"{short_hash} • {date_display} • @{author} • {subject}"
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_commit_options(repo_path, ref, repo_state):
+    """Return ([(label, hash), ...], haystacks, hash_index) for the commits on ref.
+
+    haystacks[i] is the lower-cased hash/author/message of commit i, so the
+    search filter is a single substring test per commit. hash_index maps
+    each lower-cased 7-char abbreviated hash to its position.
+    """
+    options, haystacks, hash_index = [], [], {}
+    for i, c in enumerate(cached_commits(repo_path, ref, repo_state)):
+        options.append((format_commit_option(c), c['hash']))
+        haystacks.append(f"{c['hash']}\x00{c.get('author', '')}\x00{c.get('message', '')}".lower())
+        hash_index.setdefault(c['hash'][:7].lower(), i)
+    return options, haystacks, hash_index
+
+def filter_commit_options(options, haystacks, hash_index, search):
+    """Filter commit options by a search string, capped at MAX_COMMIT_RESULTS.
+
+    A pasted abbreviated hash resolves with a direct index lookup; anything
+    else is a substring match against the precomputed haystacks.
+    """
+    search_lower = search.lower()
+    if len(search_lower) >= 7 and search_lower[:7] in hash_index:
+        i = hash_index[search_lower[:7]]
+        if options[i][1].lower().startswith(search_lower):
+            return [options[i]]
+    return list(itertools.islice(
+        (opt for opt, hay in zip(options, haystacks) if search_lower in hay),
+        MAX_COMMIT_RESULTS))
 
 # Page Config
 st.set_page_config(
@@ -72,62 +435,16 @@ st.set_page_config(
 )
 
 # World-Class HMI Styling
-st.markdown("""
-<style>
-    .main { background-color: #0d1117; color: #c9d1d9; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Helvetica, Arial, sans-serif; }
-    .stTabs [data-baseweb="tab-list"] { gap: 10px; }
-    .stTabs [data-baseweb="tab"] { background-color: #161b22; border: 1px solid #30363d; border-radius: 6px 6px 0 0; color: #8b949e; padding: 10px 20px; }
-    .stTabs [aria-selected="true"] { background-color: #0d1117; color: #58a6ff; border-bottom: 2px solid #58a6ff; }
-    
-    .hero-panel { background: #161b22; padding: 1.5rem; border-radius: 12px; border: 1px solid #30363d; box-shadow: 0 4px 20px rgba(0,0,0,0.5); }
-    .finding-alert { padding: 12px; border-radius: 6px; margin-bottom: 8px; border-left: 5px solid; }
-    .finding-high { background: rgba(248, 81, 79, 0.1); border-color: #f85149; color: #ff7b72; }
-    .finding-med { background: rgba(210, 153, 34, 0.1); border-color: #d29922; color: #d29922; }
-    
-    .lego-block { background: #21262d; border: 1px solid #30363d; padding: 10px; border-radius: 6px; margin-bottom: 8px; display: flex; justify-content: space-between; align-items: center; }
-    .lego-block:hover { border-color: #58a6ff; }
-    .lego-tag { font-size: 0.7em; padding: 2px 6px; border-radius: 10px; background: #30363d; color: #8b949e; margin-right: 8px; }
-    
-    .status-bar { padding: 8px 20px; background: #161b22; border-top: 1px solid #30363d; position: fixed; bottom: 0; left: 0; width: 100%; color: #8b949e; z-index: 1000; font-family: monospace; font-size: 0.85em; }
-    .hero-btn>button { background: linear-gradient(135deg, #1f6feb, #58a6ff) !important; color: white !important; height: 3.5rem !important; font-size: 1.2em !important; font-weight: 700 !important; border: none !important; border-radius: 8px !important; box-shadow: 0 4px 20px rgba(31, 111, 235, 0.4) !important; transition: all 0.3s !important; }
-    .hero-btn>button:hover { transform: translateY(-2px) !important; box-shadow: 0 6px 25px rgba(31, 111, 235, 0.6) !important; }
-    .status-indicator { display: inline-block; padding: 6px 14px; background: #21262d; border: 1px solid #30363d; border-radius: 20px; font-size: 0.9em; color: #8b949e; font-weight: 500; }
-    .status-indicator.ready { border-color: #238636; color: #2ea043; }
-    .compact-select { margin-bottom: 0.5rem; }
-    /* Mermaid Styles Override */
-    .mermaid { background: transparent !important; }
-    .timer-badge { font-family: monospace; background: #30363d; color: #58a6ff; padding: 2px 6px; border-radius: 4px; font-size: 0.9em; }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(cockpit_css(), unsafe_allow_html=True)
 
 # --- State Management ---
-if 'repo' not in st.session_state: st.session_state.repo = None
-if 'target' not in st.session_state: st.session_state.target = "main"
-if 'source' not in st.session_state: st.session_state.source = "HEAD"
-if 'target_commit' not in st.session_state: st.session_state.target_commit = None
-if 'source_commit' not in st.session_state: st.session_state.source_commit = None
-if 'active_bundle' not in st.session_state: st.session_state.active_bundle = []
-if 'selected_file' not in st.session_state: st.session_state.selected_file = None
-if 'agent_active' not in st.session_state: st.session_state.agent_active = False
-if 'is_executing' not in st.session_state: st.session_state.is_executing = False
-if 'current_step' not in st.session_state: st.session_state.current_step = None
-if 'completed_steps' not in st.session_state: st.session_state.completed_steps = []
-if 'execution_times' not in st.session_state: st.session_state.execution_times = {}
-if 'show_advanced' not in st.session_state: st.session_state.show_advanced = False
-if 'show_advanced' not in st.session_state: st.session_state.show_advanced = False
-if 'setup_complete' not in st.session_state: st.session_state.setup_complete = False
-if 'execution_result' not in st.session_state: st.session_state.execution_result = None
-if 'show_results' not in st.session_state: st.session_state.show_results = False
-if 'tool_choice' not in st.session_state: st.session_state.tool_choice = "GitHub Copilot CLI"
-if 'model_choice' not in st.session_state: st.session_state.model_choice = "gpt-4"
-# Summarization state
-if 'use_summarized' not in st.session_state: st.session_state.use_summarized = False
-if 'summarized_diff' not in st.session_state: st.session_state.summarized_diff = None
-if 'summarized_commits' not in st.session_state: st.session_state.summarized_commits = None
-if 'commit_search' not in st.session_state: st.session_state.commit_search = ""
+for key, value in SESSION_DEFAULTS.items():
+    if key not in st.session_state:
+        # Copy so sessions never share the default list/dict objects
+        st.session_state[key] = copy.copy(value)
 
 # --- Auto-Detection & Error Handling ---
-repos = ui_utils.list_repositories()
+repos = cached_repositories(dir_mtime("repository-setup"))
 
 # Auto-detect current repo if not set, or if current repo is invalid
 if not st.session_state.repo or st.session_state.repo not in repos:
@@ -159,10 +476,8 @@ config = config_utils.load_repo_config(st.session_state.repo)
 repo_path = config.get('path', '.') if config else '.'
 
 # Validate repo path
-try:
-    result = subprocess.run(["git", "-C", repo_path, "rev-parse", "--git-dir"], 
-                          capture_output=True, text=True, check=True)
-    branches = ui_utils.get_branches(repo_path)
+if cached_is_git_repo(repo_path):
+    branches = cached_branches(repo_path, ui_utils.get_refs_state(repo_path))
     
     # Auto-detect main branch if default doesn't exist
     if st.session_state.target not in branches:
@@ -172,7 +487,7 @@ try:
             st.session_state.target = "master"
         elif branches:
             st.session_state.target = branches[0]
-except (subprocess.CalledProcessError, FileNotFoundError):
+else:
     st.error(f"⚠️ Invalid repository path: `{repo_path}`")
     st.markdown("""
     The configured repository path is not a valid git repository.
@@ -184,12 +499,23 @@ except (subprocess.CalledProcessError, FileNotFoundError):
     """.format(st.session_state.repo))
     st.stop()
 
+# Local aliases for the ref selection; session state is only written on change
+ss = st.session_state
+target, source = ss.target, ss.source
+
+# Fingerprint of HEAD + selected refs (+ working tree), keys the git caches
+repo_state = ui_utils.get_repo_state(
+    repo_path,
+    [target, source if source != "Working Directory" else None],
+    include_worktree=source == "Working Directory"
+)
+
 # --- HEADER ---
 with st.container():
     h_col1, h_col2 = st.columns([0.8, 8], gap="small")
     with h_col1:
-        if os.path.exists("cockpit/assets/logo.png"):
-            st.image("cockpit/assets/logo.png", width=72)
+        if cached_path_exists(LOGO_PATH):
+            st.image(LOGO_PATH, width=72)
         else:
             st.markdown("<h1>🤖</h1>", unsafe_allow_html=True)
     with h_col2:
@@ -201,155 +527,135 @@ with st.container():
     
     with col1:
         new_repo = st.selectbox("📦 Repository", options=repos, 
-                               index=repos.index(st.session_state.repo) if st.session_state.repo in repos else 0,
+                               index=repos.index(ss.repo) if ss.repo in repos else 0,
                                key="repo_select")
-        if new_repo != st.session_state.repo:
-            st.session_state.repo = new_repo
-            st.session_state.selected_file = None
+        if new_repo != ss.repo:
+            ss.repo = new_repo
+            ss.selected_file = None
             st.rerun()
 
     with col2:
         new_target = st.selectbox("📍 Compare Against", options=branches, 
-                                 index=branches.index(st.session_state.target) if st.session_state.target in branches else 0,
+                                 index=branches.index(target) if target in branches else 0,
                                  key="target_select")
-        if new_target != st.session_state.target:
-            st.session_state.target = new_target
-            st.session_state.target_commit = None
+        if new_target != target:
+            ss.target = new_target
+            ss.target_commit = None
             st.rerun()
 
     with col3:
         source_opts = ["Working Directory"] + branches
         new_source = st.selectbox("✨ Your Changes", options=source_opts, 
-                                 index=source_opts.index(st.session_state.source) if st.session_state.source in source_opts else 0,
+                                 index=source_opts.index(source) if source in source_opts else 0,
                                  key="source_select")
-        if new_source != st.session_state.source:
-            st.session_state.source = new_source
-            st.session_state.source_commit = None
+        if new_source != source:
+            ss.source = new_source
+            ss.source_commit = None
             st.rerun()
     
     with col4:
         # Invisible header to align the Advanced button vertically with the selects
         st.markdown("<p style='padding-top: 12px;'></p>", unsafe_allow_html=True)
         if st.button("⚙️ Advanced", use_container_width=True):
-            st.session_state.show_advanced = not st.session_state.show_advanced
+            ss.show_advanced = not ss.show_advanced
             st.rerun()
 
+target_commit, source_commit = ss.target_commit, ss.source_commit
+
 # Advanced Options (Collapsed by Default)
-if st.session_state.show_advanced:
+if ss.show_advanced:
     with st.expander("🔧 Advanced Options", expanded=True):
-        # Helper function for commit display
-        def format_commit_option(commit: dict) -> str:
-            """Format commit for dropdown: 'abc1234 • Dec 23 • @author • Fix login bug'"""
-            short_hash = commit['hash'][:7]
-            date_str = commit.get('date', '').split()[0] if commit.get('date') else ''
-            try:
-                from datetime import datetime
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                date_display = date_obj.strftime('%b %d')
-            except:
-                date_display = date_str[:10] if date_str else '?'
-            author = commit.get('author', 'unknown').split()[0][:10]
-            subject = commit.get('message', '')[:35]
-            if len(commit.get('message', '')) > 35:
-                subject += '...'
-            return f"{short_hash} • {date_display} • @{author} • {subject}"
-        
         adv_col1, adv_col2 = st.columns(2)
         
         with adv_col1:
             st.markdown("**Compare Against - Specific Commit**")
-            target_commits = ui_utils.get_commits(repo_path, st.session_state.target)
+            target_options, target_haystacks, target_hash_index = cached_commit_options(repo_path, target, repo_state)
             
             # Search filter
             target_search = st.text_input("🔍 Filter", placeholder="hash, author, or message...", key="target_commit_search")
             
             # Filter commits
-            filtered_target = target_commits
+            filtered_target = target_options
             if target_search:
-                search_lower = target_search.lower()
-                filtered_target = [c for c in target_commits if (
-                    search_lower in c['hash'].lower() or 
-                    search_lower in c.get('author', '').lower() or 
-                    search_lower in c.get('message', '').lower()
-                )]
+                filtered_target = filter_commit_options(target_options, target_haystacks, target_hash_index, target_search)
             
             # Build display options
-            target_commit_opts = ["Current HEAD"] + [format_commit_option(c) for c in filtered_target]
-            label_to_hash_target = {format_commit_option(c): c['hash'] for c in filtered_target}
-            hash_to_label_target = {c['hash']: format_commit_option(c) for c in filtered_target}
-            
-            current_label = "Current HEAD"
-            if st.session_state.target_commit and st.session_state.target_commit in hash_to_label_target:
-                current_label = hash_to_label_target[st.session_state.target_commit]
+            target_commit_opts = ["Current HEAD"]
+            label_to_hash_target, hash_to_index_target = {}, {}
+            for label, commit_hash in filtered_target:
+                hash_to_index_target[commit_hash] = len(target_commit_opts)
+                target_commit_opts.append(label)
+                label_to_hash_target[label] = commit_hash
             
             selected_label = st.selectbox("Target Commit", options=target_commit_opts,
-                index=target_commit_opts.index(current_label) if current_label in target_commit_opts else 0,
+                index=hash_to_index_target.get(target_commit, 0),
                 label_visibility="collapsed", key="target_commit_select")
             
-            st.session_state.target_commit = label_to_hash_target.get(selected_label) if selected_label != "Current HEAD" else None
+            new_target_commit = label_to_hash_target.get(selected_label) if selected_label != "Current HEAD" else None
+            if new_target_commit != target_commit:
+                ss.target_commit = target_commit = new_target_commit
             
             if target_search:
-                st.caption(f"Showing {len(filtered_target)} of {len(target_commits)} commits")
+                more = "+" if len(filtered_target) == MAX_COMMIT_RESULTS else ""
+                st.caption(f"Showing {len(filtered_target)}{more} of {len(target_options)} commits")
         
         with adv_col2:
-            if st.session_state.source != "Working Directory":
+            if source != "Working Directory":
                 st.markdown("**Your Changes - Specific Commit**")
-                source_commits = ui_utils.get_commits(repo_path, st.session_state.source)
+                source_options, source_haystacks, source_hash_index = cached_commit_options(repo_path, source, repo_state)
                 
                 # Search filter
                 source_search = st.text_input("🔍 Filter", placeholder="hash, author, or message...", key="source_commit_search")
                 
                 # Filter commits
-                filtered_source = source_commits
+                filtered_source = source_options
                 if source_search:
-                    search_lower = source_search.lower()
-                    filtered_source = [c for c in source_commits if (
-                        search_lower in c['hash'].lower() or 
-                        search_lower in c.get('author', '').lower() or 
-                        search_lower in c.get('message', '').lower()
-                    )]
-                
-                source_commit_opts = ["Current HEAD"] + [format_commit_option(c) for c in filtered_source]
-                label_to_hash_source = {format_commit_option(c): c['hash'] for c in filtered_source}
-                hash_to_label_source = {c['hash']: format_commit_option(c) for c in filtered_source}
+                    filtered_source = filter_commit_options(source_options, source_haystacks, source_hash_index, source_search)
                 
-                current_source_label = "Current HEAD"
-                if st.session_state.source_commit and st.session_state.source_commit in hash_to_label_source:
-                    current_source_label = hash_to_label_source[st.session_state.source_commit]
+                source_commit_opts = ["Current HEAD"]
+                label_to_hash_source, hash_to_index_source = {}, {}
+                for label, commit_hash in filtered_source:
+                    hash_to_index_source[commit_hash] = len(source_commit_opts)
+                    source_commit_opts.append(label)
+                    label_to_hash_source[label] = commit_hash
                 
                 selected_source = st.selectbox("Source Commit", options=source_commit_opts,
-                    index=source_commit_opts.index(current_source_label) if current_source_label in source_commit_opts else 0,
+                    index=hash_to_index_source.get(source_commit, 0),
                     label_visibility="collapsed", key="source_commit_select")
                 
-                st.session_state.source_commit = label_to_hash_source.get(selected_source) if selected_source != "Current HEAD" else None
+                new_source_commit = label_to_hash_source.get(selected_source) if selected_source != "Current HEAD" else None
+                if new_source_commit != source_commit:
+                    ss.source_commit = source_commit = new_source_commit
                 
                 if source_search:
-                    st.caption(f"Showing {len(filtered_source)} of {len(source_commits)} commits")
-            else:
-                st.session_state.source_commit = None
+                    more = "+" if len(filtered_source) == MAX_COMMIT_RESULTS else ""
+                    st.caption(f"Showing {len(filtered_source)}{more} of {len(source_options)} commits")
+            elif source_commit is not None:
+                ss.source_commit = source_commit = None
 
 # Final Resolved Refs for Engine
-actual_target, actual_source, _is_direct = ui_utils.get_smart_refs(repo_path, st.session_state.target, st.session_state.source, st.session_state.target_commit, st.session_state.source_commit)
-changed_files = ui_utils.get_changed_files(repo_path, st.session_state.target, st.session_state.source, st.session_state.target_commit, st.session_state.source_commit)
+actual_target, actual_source, _is_direct = cached_smart_refs(repo_path, target, source, target_commit, source_commit, repo_state)
+changed_files = cached_changed_files(repo_path, target, source, target_commit, source_commit, repo_state)
 
-if changed_files and not st.session_state.selected_file:
-    st.session_state.selected_file = changed_files[0]
+if changed_files and not ss.selected_file:
+    ss.selected_file = changed_files[0]
 
 # Status Indicator
 if changed_files:
-    total_diff = ui_utils.get_diff(repo_path, actual_target, actual_source, target_commit=st.session_state.target_commit, source_commit=st.session_state.source_commit)
-    lines_added = total_diff.count('\n+')
-    lines_removed = total_diff.count('\n-')
+    lines_added, lines_removed = cached_diff_numstat(repo_path, actual_target, actual_source, target_commit, source_commit, repo_state)
     st.markdown(f'<span class="status-indicator ready">🟢 {len(changed_files)} files • +{lines_added} -{lines_removed} lines</span>', unsafe_allow_html=True)
     
-    # Token Estimation
-    estimated_tokens = estimate_tokens(total_diff)
+    # Token Estimation: a numstat-based guess; the full patch is only measured when it looks large
+    estimated_tokens = (lines_added + lines_removed) * AVG_CHARS_PER_LINE // CHARS_PER_TOKEN
+    if estimated_tokens > TOKEN_THRESHOLD:
+        estimated_tokens = estimate_tokens(cached_diff(repo_path, actual_target, actual_source, target_commit, source_commit, repo_state))
     if estimated_tokens > TOKEN_THRESHOLD:
         st.warning(f"⚠️ Large diff detected: ~{estimated_tokens:,} tokens. Consider using Summarize.")
         sum_col1, sum_col2 = st.columns([1, 3])
         with sum_col1:
             if st.button("⚡ Summarize", help="Use Gemini API to optimize context for large diffs"):
                 with st.spinner("Summarizing with Gemini API..."):
+                    total_diff = cached_diff(repo_path, actual_target, actual_source, target_commit, source_commit, repo_state)
                     st.session_state.summarized_diff = summarize_with_gemini(total_diff, "diff")
                     st.session_state.use_summarized = True
                     st.success("✅ Diff summarized")
@@ -366,11 +672,9 @@ else:
 
 # Commit History Panel
 if changed_files:
-    from scripts.git_operations import get_commits_between
-    
     with st.expander("📝 Commit History", expanded=False):
         try:
-            commits = get_commits_between(repo_path, actual_target, actual_source)
+            commits = cached_commits_between(repo_path, actual_target, actual_source, repo_state)
             
             if commits['total_count'] > 0:
                 st.caption(f"Showing {len(commits['tier1'])} detailed + {len(commits['tier2'])} summary of {commits['total_count']} total commits")
@@ -405,7 +709,10 @@ st.divider()
 
 # --- MAIN LAYOUT ---
 # Master Navigation Tabs (Simplified)
-tab_review, tab_history, tab_editor, tab_settings = st.tabs(["🔍 Review & Analyze", "📜 History", "📝 Editor", "⚙️ Settings"])
+# on_change="rerun" tracks the selected tab, so the inactive ones can skip their work
+tab_review, tab_history, tab_editor, tab_settings = st.tabs(
+    ["🔍 Review & Analyze", "📜 History", "📝 Editor", "⚙️ Settings"], key="main_tabs", on_change="rerun"
+)
 
 # --- TAB 1: REVIEW & ANALYZE ---
 with tab_review:
@@ -418,13 +725,12 @@ with tab_review:
         if st.button("🚀 RUN AI REVIEW", use_container_width=True, disabled=st.session_state.is_executing or not changed_files):
             if not st.session_state.active_bundle:
                 # Use default bundle if none selected
-                default_recipe = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                                            "prompts", "recipes", "standard_pr_review.md")
-                if os.path.exists(default_recipe):
-                    st.session_state.active_bundle = [default_recipe]
+                if cached_path_exists(DEFAULT_RECIPE):
+                    st.session_state.active_bundle = [DEFAULT_RECIPE]
             
             if st.session_state.active_bundle:
                 st.session_state.is_executing = True
+                st.session_state.run_state = {}
                 st.session_state.completed_steps = []
                 st.session_state.execution_times = {}
                 st.rerun()
@@ -435,52 +741,11 @@ with tab_review:
         # Layout: Tree Selector | Preview Panel
         comp_col1, comp_col2 = st.columns([1.2, 1.8], gap="medium")
         
-        library = ui_utils.list_prompt_library()
+        prompts_state = prompts_dir_state()
+        library = cached_prompt_library(prompts_state)
         
-        # Build Tree Items & Label Map (Pre-calculation)
-        tree_data = {}
-        label_map = {}
+        label_map = cached_prompt_labels(prompts_state)
         lib_lookup = {item['full_path']: item for item in library}
-        
-        for item in library:
-            folder = os.path.dirname(item['name']) or "root"
-            if "macros" in folder: continue
-            if folder not in tree_data: tree_data[folder] = []
-            tree_data[folder].append(item)
-            
-        folder_order = ['recipes', 'library', 'root']
-        sorted_folders = sorted(tree_data.keys(), key=lambda x: folder_order.index(x) if x in folder_order else 99)
-        
-        sac_items = []
-        for folder in sorted_folders:
-            children = []
-            for item in tree_data[folder]:
-                desc = item.get('description')
-                
-                # Unique label logic
-                base_label = os.path.basename(item['name'])
-                label = base_label
-                counter = 1
-                while label in label_map:
-                    label = f"{base_label} ({counter})"
-                    counter += 1
-                
-                label_map[label] = item['full_path']
-                
-                desc_str = desc if desc else ""
-                children.append(sac.TreeItem(
-                    label=label,
-                    icon='file-text',
-                    description=desc_str[:57]+"..." if len(desc_str)>60 else desc_str,
-                    tooltip=desc_str
-                ))
-            
-            icon = 'folder-open' if 'recipes' in folder else 'folder'
-            sac_items.append(sac.TreeItem(
-                label=folder.title(),
-                icon=icon,
-                children=children
-            ))
 
         # --- LEFT COLUMN: SELECTOR ---
         with comp_col1:
@@ -508,52 +773,46 @@ with tab_review:
             
             if not st.session_state.active_bundle:
                  st.info("👈 Select detailed recipes from the library to build your analysis strategy.")
-                 default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prompts", "recipes", "standard_pr_review.md")
-                 if os.path.exists(default_path) and default_path not in st.session_state.active_bundle:
+                 if cached_path_exists(DEFAULT_RECIPE):
                      st.caption("ℹ️ If empty, 'Standard PR Review' applies by default.")
             else:
                  st.caption(f"The following **{len(st.session_state.active_bundle)} recipes** will be executed in order:")
                  
+                 cards = []
                  for i, path in enumerate(st.session_state.active_bundle):
                      item = lib_lookup.get(path)
-                     fname = os.path.basename(path)
                      if item:
                          desc = item.get('description', 'No description available.')
                          tags = item.get('tags', [])
                      else:
                          desc = "Unknown recipe"
                          tags = []
-                     
-                     tags_html = "".join([f'<span class="lego-tag">{t}</span>' for t in tags])
-                     
-                     st.markdown(f"""
-                     <div style="background: #161b22; border: 1px solid #30363d; border-radius: 6px; padding: 12px; margin-bottom: 8px; display: flex; flex-direction: column;">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 4px;">
-                            <span style="font-weight: 600; color: #58a6ff;">{i+1}. {fname}</span>
-                            <span style="font-size: 0.8em; color: #8b949e; font-family: monospace;">{len(tags)} tags</span>
-                        </div>
-                        <div style="font-size: 0.9em; color: #c9d1d9; margin-bottom: 8px;">{desc}</div>
-                        <div>{tags_html}</div>
-                     </div>
-                     """, unsafe_allow_html=True)
+                     cards.append(RECIPE_CARD_HTML.format(
+                         index=i + 1,
+                         name=os.path.basename(path),
+                         tag_count=len(tags),
+                         desc=desc,
+                         tags_html="".join(f'<span class="lego-tag">{t}</span>' for t in tags)
+                     ))
+                 # One markdown element for the whole plan instead of one per recipe
+                 st.markdown("".join(cards), unsafe_allow_html=True)
 
     # Tool Selection
     with st.expander("⚙️ AI Tool Configuration", expanded=False):
-        new_tool = st.selectbox("AI Provider", ["GitHub Copilot CLI", "Gemini API", "Gemini CLI"], 
-                               index=0 if st.session_state.tool_choice == "GitHub Copilot CLI" else (1 if st.session_state.tool_choice == "Gemini API" else 2))
+        tool_options = list(TOOL_PROVIDERS)
+        new_tool = st.selectbox("AI Provider", tool_options,
+                               index=tool_options.index(st.session_state.tool_choice) if st.session_state.tool_choice in tool_options else 0)
         if new_tool != st.session_state.tool_choice:
             st.session_state.tool_choice = new_tool
             st.rerun()
         
         if st.session_state.tool_choice == "Gemini API":
-            try:
-                from scripts.llm_strategy import get_provider
-                provider = get_provider("gemini")
-                available_models = provider.list_models()
-            except Exception:
-                available_models = ["gemini-2.0-flash-exp", "gemini-1.5-pro", "gemini-1.5-flash"]
-            
+            # Only list models when the session has none for this tool yet
             if 'available_models' not in st.session_state or st.session_state.get('last_tool_choice') != st.session_state.tool_choice:
+                try:
+                    available_models = cached_model_list("gemini")
+                except Exception:
+                    available_models = ["gemini-2.0-flash-exp", "gemini-1.5-pro", "gemini-1.5-flash"]
                 st.session_state.available_models = available_models
                 st.session_state.last_tool_choice = st.session_state.tool_choice
             
@@ -564,14 +823,12 @@ with tab_review:
             if new_model != st.session_state.model_choice:
                 st.session_state.model_choice = new_model
         elif st.session_state.tool_choice == "Gemini CLI":
-            try:
-                from scripts.llm_strategy import get_provider
-                provider = get_provider("gemini-cli")
-                available_models = provider.list_models()
-            except Exception:
-                available_models = ["gemini-2.5-pro", "gemini-2.0-flash", "gemini-2.5-flash", "gemini-3-flash-preview"]
-            
+            # Only list models when the session has none for this tool yet
             if 'available_models' not in st.session_state or st.session_state.get('last_tool_choice') != st.session_state.tool_choice:
+                try:
+                    available_models = cached_model_list("gemini-cli")
+                except Exception:
+                    available_models = ["gemini-2.5-pro", "gemini-2.0-flash", "gemini-2.5-flash", "gemini-3-flash-preview"]
                 st.session_state.available_models = available_models
                 st.session_state.last_tool_choice = st.session_state.tool_choice
             
@@ -584,6 +841,9 @@ with tab_review:
         else:
             st.session_state.model_choice = "gpt-4"  # Default for Copilot CLI
             st.caption("Using GitHub Copilot CLI (no model selection needed)")
+
+        st.checkbox("Force refresh", key="force_refresh",
+                    help="Call the AI even if an identical review (same diff, prompt and model) is cached")
     
     st.divider()
     
@@ -604,9 +864,8 @@ with tab_review:
                     diff_content = st.session_state.summarized_diff
                     st.info("ℹ️ Using pre-summarized diff for context optimization")
                 else:
-                    diff_content = ui_utils.get_diff(repo_path, actual_target, actual_source, 
-                                                    target_commit=st.session_state.target_commit, 
-                                                    source_commit=st.session_state.source_commit)
+                    diff_content = cached_diff(repo_path, actual_target, actual_source,
+                                               target_commit, source_commit, repo_state)
                 
                 elapsed = time.time() - start_time
                 st.write(f"   ✓ Fetched {len(diff_content)} chars of changes ({elapsed:.2f}s)")
@@ -616,14 +875,7 @@ with tab_review:
                 # Fetch Commit History for Context
                 commit_history = {}
                 try:
-                    from scripts.git_operations import get_commits_between
-                    commit_history = get_commits_between(
-                        repo_path, 
-                        actual_target, 
-                        actual_source,
-                        tier1_limit=10,
-                        tier2_limit=50
-                    )
+                    commit_history = cached_commits_between(repo_path, actual_target, actual_source, repo_state)
                     st.write(f"   ✓ Loaded {commit_history.get('total_count', 0)} commits for context")
                 except Exception as e:
                     st.warning(f"   ⚠️ Failed to load commit history: {e}")
@@ -631,35 +883,61 @@ with tab_review:
                 # Step 2: Prepare prompt
                 st.write("🧱 **Step 2/5:** Building review prompt...")
                 
-                # Create output directory early for template rendering
-                timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
-                out_folder = f"output/{timestamp}-{st.session_state.repo}-review"
+                # Create output directory early for template rendering; an interrupted
+                # run resumes into the same folder
+                run_state = st.session_state.run_state
+                if run_state is None:
+                    run_state = st.session_state.run_state = {}
+                if "out_folder" not in run_state:
+                    timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+                    run_state["out_folder"] = f"output/{timestamp}-{st.session_state.repo}-review"
+                out_folder = run_state["out_folder"]
                 
                 # We construct the prompt manually here to support multiple recipes
                 # But we must ensure the macros work
                 
-                full_prompt = ""
+                recipe_prompts = []
+                # Whether each rendered recipe still has a literal {{ DIFF_CONTENT }}. Recipes
+                # are rendered without the diff (inject_diff_content=False), so this only
+                # scans the recipe text, never the diff itself.
+                placeholders = []
                 # Inject diff at the top for some recipes, or let macros handle it?
                 # The Orchestrator uses render_prompt_with_context. 
                 # Here we loop through active_bundle (recipes).
                 
-                for p_path in st.session_state.active_bundle:
-                    # Pass context data to render_template
-                    part = render_template(
+                def render_recipe(p_path, repo_name=st.session_state.repo):
+                    # Pass context data to render_template; runs in worker threads, so no st.*
+                    return render_template(
                         p_path, 
                         diff_content, 
-                        repo_name=st.session_state.repo, 
+                        repo_name=repo_name, 
                         inject_diff_content=False, # Recipes usually include {{ DIFF_CONTENT }} explicitly
                         commit_history_data=commit_history,
                         target_ref=actual_target,
                         source_ref=actual_source,
-                        OUTPUT_DIR=out_folder
+                        OUTPUT_DIR=OUTPUT_DIR_PLACEHOLDER  # Bound after hashing, see below
                     )
-                    full_prompt += part + "\n\n---\n\n"
                 
-                # Fallback if no recipe includes DIFF_CONTENT
-                if "{{ DIFF_CONTENT }}" not in full_prompt and "diff" not in full_prompt.lower()[:200]:
-                     full_prompt += f"\n\n## DIFF\n\n```diff\n{diff_content}\n```"
+                bundle = st.session_state.active_bundle
+                if len(bundle) > 1:
+                    # Recipes are independent; render them side by side (map keeps bundle order)
+                    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CALLS, len(bundle))) as pool:
+                        parts = list(pool.map(render_recipe, bundle))
+                else:
+                    parts = [render_recipe(p_path) for p_path in bundle]
+                # Each recipe is cached under its own key, taken before the run folder is
+                # filled in so a later run finds it; the diff is keyed by diff_hash
+                recipe_hashes = [hashlib.blake2b(part.encode(), digest_size=16).hexdigest() for part in parts]
+                parts = [bind_output_dir(part, out_folder) for part in parts]
+                for part in parts:
+                    recipe_prompts.append(part + "\n\n---\n\n")
+                    placeholders.append("{{ DIFF_CONTENT }}" in part)
+                
+                # The combined prompt is what gets saved; each recipe is
+                # also sent on its own when the bundle has several
+                full_prompt = with_diff_fallback("".join(recipe_prompts), diff_content, any(placeholders))
+                recipe_prompts = [with_diff_fallback(part, diff_content, has_placeholder)
+                                  for part, has_placeholder in zip(recipe_prompts, placeholders)]
                 
                 st.write(f"   ✓ Prompt ready ({len(st.session_state.active_bundle)} instruction(s) included)")
                 
@@ -667,35 +945,69 @@ with tab_review:
                 st.write("💾 **Step 3/5:** Saving artifacts...")
                 os.makedirs(out_folder, exist_ok=True)
                 
-                with open(f"{out_folder}/prompt.txt", "w") as f:
-                    f.write(full_prompt)
-                with open(f"{out_folder}/diff.patch", "w") as f:
-                    f.write(diff_content)
-                
-                st.write(f"   ✓ Saved to `{out_folder}`")
-                
-                # Step 4: Call AI
-                st.write(f"🤖 **Step 4/5:** Calling {st.session_state.tool_choice} with {st.session_state.model_choice}...")
-                st.info("⏳ This may take 30-60 seconds. Please wait...")
-                
-                # Use Strategy Pattern for LLM provider
-                from scripts.llm_strategy import get_provider
-                
-                provider_map = {
-                    "Gemini API": "gemini",
-                    "Gemini CLI": "gemini-cli",
-                    "GitHub Copilot CLI": "gh-copilot"
-                }
-                provider_name = provider_map.get(st.session_state.tool_choice, "gemini")
-                provider = get_provider(provider_name)
-                
-                # Call the provider
-                if provider_name == "gh-copilot":
-                    response = provider.call(full_prompt, allow_tools=['shell(git)', 'write'], timeout=300)
-                elif provider_name == "gemini-cli":
-                    response = provider.call(full_prompt, model=st.session_state.model_choice, allow_tools=['shell(git)', 'write'], timeout=300)
+                # Encoded once, reused for the artifacts and the diff hash
+                diff_bytes = diff_content.encode()
+                prompt_bytes = full_prompt.encode()
+                # Written in the background while the AI call runs; awaited in Step 5
+                artifact_pool = ThreadPoolExecutor(max_workers=2)
+                artifact_writes = [
+                    artifact_pool.submit(write_artifact, f"{out_folder}/prompt.txt", prompt_bytes),
+                    artifact_pool.submit(write_artifact, f"{out_folder}/diff.patch", diff_bytes),
+                ]
+                artifact_pool.shutdown(wait=False)
+                
+                st.write(f"   ✓ Saving to `{out_folder}`")
+                
+                # Step 4: Call AI (unless this exact review is already cached)
+                model_choice = st.session_state.model_choice
+                diff_hash = hashlib.blake2b(diff_bytes, digest_size=16).hexdigest()
+                response_key = (diff_hash, tuple(recipe_hashes), model_choice)
+                recipe_responses = [None] * len(recipe_hashes)
+                if not st.session_state.get("force_refresh"):
+                    recipe_responses = [db_manager.get_cache(diff_hash, h, model_choice) for h in recipe_hashes]
+                # Recipes with no cached review; only these are called and saved
+                missing = [i for i, r in enumerate(recipe_responses) if r is None]
+
+                if run_state.get("response_key") == response_key:
+                    # This run already got its answer before a rerun interrupted it
+                    st.write("⚡ **Step 4/5:** Reusing the response received before the interruption")
+                    recipe_responses = run_state["recipe_responses"]
+                elif not missing:
+                    st.write("⚡ **Step 4/5:** Identical review found in history, skipping the AI call")
                 else:
-                    response = provider.call(full_prompt, model=st.session_state.model_choice)
+                    st.write(f"🤖 **Step 4/5:** Calling {st.session_state.tool_choice} with {model_choice}...")
+                    if len(missing) < len(recipe_hashes):
+                        st.write(f"   ✓ Reusing {len(recipe_hashes) - len(missing)} cached recipe review(s)")
+                    st.info("⏳ This may take 30-60 seconds. Please wait...")
+                
+                    # Use Strategy Pattern for LLM provider
+                    provider_name = TOOL_PROVIDERS.get(st.session_state.tool_choice, "gemini")
+                    provider = llm_provider(provider_name)
+                
+                    # Call the provider: independent recipes run in parallel, one call each
+                    if len(recipe_prompts) > 1:
+                        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CALLS, len(missing))) as pool:
+                            responses = pool.map(
+                                lambda i: call_provider(provider, provider_name, recipe_prompts[i], model_choice),
+                                missing
+                            )
+                            for i, r in zip(missing, responses):
+                                recipe_responses[i] = r
+                    elif provider.supports_streaming:
+                        # Render the review as it arrives instead of after the whole call
+                        options = CLI_AGENT_OPTIONS if provider_name in ("gemini-cli", "gh-copilot") else {}
+                        recipe_responses[0] = st.write_stream(provider.stream(full_prompt, model=model_choice, **options))
+                    else:
+                        recipe_responses[0] = call_provider(provider, provider_name, full_prompt, model_choice)
+                    run_state.update(response_key=response_key, recipe_responses=recipe_responses)
+                
+                if len(recipe_responses) > 1:
+                    response = "\n\n---\n\n".join(
+                        f"## {os.path.basename(p_path)}\n\n{r or ''}"
+                        for p_path, r in zip(st.session_state.active_bundle, recipe_responses)
+                    )
+                else:
+                    response = recipe_responses[0]
                 
                 if response:
                     st.write(f"   ✓ Received {len(response)} characters of analysis")
@@ -704,18 +1016,24 @@ with tab_review:
                 
                 # Step 5: Save response
                 st.write("💾 **Step 5/5:** Saving results...")
-                with open(f"{out_folder}/response.md", "w") as f:
-                    f.write(response)
-                
-                db_manager.save_cache(
-                    diff_hash=hashlib.md5(diff_content.encode()).hexdigest(),
-                    prompt_hash=hashlib.md5(full_prompt.encode()).hexdigest(),
-                    model=st.session_state.model_choice,
-                    response=response,
-                    repo_name=st.session_state.repo,
-                    summary=response[:100] + "..." if response else "Empty response",
-                    tags="ui_review"
-                )
+                write_artifact(f"{out_folder}/response.md", (response or "").encode())
+                for write in artifact_writes:
+                    write.result()  # Re-raises any write error
+                
+                if missing and not run_state.get("saved"):
+                    # One row per new recipe review, committed together by db_manager's
+                    # writer thread; response.md is already on disk
+                    rows = []
+                    for i in missing:
+                        r = recipe_responses[i]
+                        summary = r[:100] + "..." if r else "Empty response"
+                        if len(bundle) > 1:
+                            summary = f"{os.path.basename(bundle[i])}: {summary}"
+                        rows.append(dict(diff_hash=diff_hash, prompt_hash=recipe_hashes[i], model=model_choice,
+                                         response=r, repo_name=st.session_state.repo, summary=summary,
+                                         tags="ui_review"))
+                    db_manager.save_cache_many_async(rows)
+                    run_state["saved"] = True
                 
                 st.write("   ✓ Results saved to database and file")
                 
@@ -724,6 +1042,7 @@ with tab_review:
                 # Store result and trigger results display
                 st.session_state.execution_result = response
                 st.session_state.is_executing = False
+                st.session_state.run_state = None
                 st.session_state.show_results = True
                 st.session_state.current_step = None
                 
@@ -737,15 +1056,16 @@ with tab_review:
                 with st.expander("📋 Full Traceback"):
                     st.code(traceback.format_exc())
                 st.session_state.is_executing = False
+                st.session_state.run_state = None
                 st.session_state.current_step = None
     
     r_col1, r_col2 = st.columns([1, 3])
     
     with r_col1:
-        file_tree.render_file_tree(repo_path, actual_target, actual_source, changed_files)
+        file_tree.render_file_tree(repo_path, target, source, target_commit, source_commit, changed_files, repo_state)
 
     with r_col2:
-        diff_viewer.render_diff_viewer(repo_path, actual_target, actual_source)
+        diff_viewer.render_diff_viewer(repo_path, actual_target, actual_source, repo_state)
     
     # Display Results (after execution completes)
     diff_viewer.render_execution_results()
@@ -753,212 +1073,203 @@ with tab_review:
 # --- TAB 2: HISTORY ---
 
 with tab_history:
-    st.markdown("### 📜 Execution History")
+    if tab_history.open:  # Only build the tab the user is looking at
+        st.markdown("### 📜 Execution History")
     
-    ht_files, ht_db = st.tabs(["📂 File Output", "🗄️ Database"])
+        ht_files, ht_db = st.tabs(["📂 File Output", "🗄️ Database"], key="history_tabs", on_change="rerun")
     
-    # --- SUB-TAB: FILES ---
-    with ht_files:
-        # Assuming output is in the root directory, one level up from cockpit/
-        output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output")
+        # --- SUB-TAB: FILES ---
+        with ht_files:
+            if ht_files.open:
+                # Assuming output is in the root directory, one level up from cockpit/
+                output_dir = OUTPUT_DIR
         
-        if os.path.exists(output_dir):
-            runs = sorted([d for d in os.listdir(output_dir) if os.path.isdir(os.path.join(output_dir, d))], reverse=True)
+                output_mtime = dir_mtime(output_dir)
+                if output_mtime is not None:
+                    runs = cached_list_runs(output_dir, output_mtime)
             
-            if runs:
-                col_h1, col_h2 = st.columns([1, 3])
-                with col_h1:
-                    selected_run = st.radio("Select Run", runs, label_visibility="collapsed")
-                
-                with col_h2:
-                    if selected_run:
-                        run_path = os.path.join(output_dir, selected_run)
-                        st.caption(f"Path: `{run_path}`")
+                    if runs:
+                        col_h1, col_h2 = st.columns([1, 3])
+                        with col_h1:
+                            selected_run = st.radio("Select Run", runs, label_visibility="collapsed")
+                
+                        with col_h2:
+                            if selected_run:
+                                run_path = os.path.join(output_dir, selected_run)
+                                st.caption(f"Path: `{run_path}`")
                         
-                        run_files = sorted(os.listdir(run_path))
-                        tabs_files = st.tabs([f for f in run_files])
+                                run_files = cached_list_run_files(run_path, dir_mtime(run_path))
+                                # Keyed per run so each run remembers its own open file
+                                tabs_files = st.tabs(run_files, key=f"history_files_{selected_run}", on_change="rerun")
                         
-                        for i, f_name in enumerate(run_files):
-                            with tabs_files[i]:
-                                file_path = os.path.join(run_path, f_name)
-                                try:
-                                    with open(file_path, "r") as f:
-                                        content = f.read()
+                                for i, f_name in enumerate(run_files):
+                                    if not tabs_files[i].open:
+                                        continue  # Only read the file being looked at
+                                    with tabs_files[i]:
+                                        file_path = os.path.join(run_path, f_name)
+                                        try:
+                                            content, truncated = cached_read_text(file_path, os.stat(file_path).st_mtime_ns)
+                                            base_name = f_name.removesuffix(".gz")
+                                            if truncated:
+                                                st.caption(f"Showing the first {HISTORY_PREVIEW_BYTES:,} bytes of `{f_name}`.")
                                     
-                                    if f_name.endswith(".json"):
-                                        st.json(content)
-                                    elif f_name.endswith(".md"):
-                                        st.markdown(content)
-                                        with st.expander("Source"):
-                                            st.code(content, language="markdown")
-                                    else:
-                                        st.code(content)
-                                except Exception as e:
-                                    st.error(f"Error reading file: {e}")
-            else:
-                st.info("No runs found.")
-        else:
-            st.error(f"Output directory not found: {output_dir}")
+                                            if base_name.endswith(".json") and not truncated:
+                                                st.json(content)
+                                            elif base_name.endswith(".md"):
+                                                st.markdown(content)
+                                                with st.expander("Source"):
+                                                    st.code(content, language="markdown")
+                                            else:
+                                                st.code(content)
+                                        except Exception as e:
+                                            st.error(f"Error reading file: {e}")
+                    else:
+                        st.info("No runs found.")
+                else:
+                    st.error(f"Output directory not found: {output_dir}")
 
-    # --- SUB-TAB: DATABASE ---
-    with ht_db:
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "history.sqlite")
-        if os.path.exists(db_path):
-            try:
-                conn = sqlite3.connect(db_path)
-                c = conn.cursor()
-                c.execute("SELECT id, timestamp, repo_name, model, cost, summary, tags FROM analysis_history ORDER BY id DESC")
-                rows = c.fetchall()
-                cols = [description[0] for description in c.description]
-                data = [dict(zip(cols, row)) for row in rows]
-                conn.close()
-                
-                if data:
-                    st.dataframe(data, use_container_width=True)
+        # --- SUB-TAB: DATABASE ---
+        with ht_db:
+            if ht_db.open:
+                db_path = HISTORY_DB_PATH
+                if os.path.exists(db_path):
+                    try:
+                        db_state = history_db_state(db_path)
+                        total = cached_history_count(db_path, db_state)
+                
+                        if total:
+                            page = 1
+                            if total > HISTORY_PAGE_SIZE:
+                                pages = (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+                                page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+                            df = cached_history_page(db_path, page, db_state)
+                            st.dataframe(df, use_container_width=True, hide_index=True)
+                        else:
+                            st.info("Database is empty.")
+                    except Exception as e:
+                        st.error(f"Error reading database: {e}")
                 else:
-                    st.info("Database is empty.")
-            except Exception as e:
-                st.error(f"Error reading database: {e}")
-        else:
-            st.warning(f"Database not found at {db_path}")
+                    st.warning(f"Database not found at {db_path}")
 
 # --- TAB 3: EDITOR ---
 with tab_editor:
-    st.markdown("### 📝 Prompt Editor")
+    if tab_editor.open:  # Only build the tab the user is looking at
+        st.markdown("### 📝 Prompt Editor")
     
-    e_col1, e_col2 = st.columns([1, 3])
+        e_col1, e_col2 = st.columns([1, 3])
     
-    with e_col1:
-        editor_mode = st.radio("Mode", ["Recipes", "Library"], horizontal=True)
+        with e_col1:
+            editor_mode = st.radio("Mode", ["Recipes", "Library"], horizontal=True)
         
-        base_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prompts")
-        target_dir = os.path.join(base_path, "recipes") if editor_mode == "Recipes" else os.path.join(base_path, "library")
+            target_dir = RECIPES_DIR if editor_mode == "Recipes" else LIBRARY_DIR
         
-        if os.path.exists(target_dir):
-            files = []
-            for root, dirs, filenames in os.walk(target_dir):
-                for filename in filenames:
-                    if filename.endswith(".md"):
-                        rel_path = os.path.relpath(os.path.join(root, filename), target_dir)
-                        files.append(rel_path)
-            files.sort()
+            if cached_path_exists(target_dir):
+                files = cached_md_files(target_dir, prompts_state)
             
-            selected_edit_file = st.selectbox("Select File", files, index=0 if files else None)
-        else:
-            st.error(f"Directory not found: {target_dir}")
-            selected_edit_file = None
+                selected_edit_file = st.selectbox("Select File", files, index=0 if files else None)
+            else:
+                st.error(f"Directory not found: {target_dir}")
+                selected_edit_file = None
 
-    with e_col2:
-        if selected_edit_file:
-            full_edit_path = os.path.join(target_dir, selected_edit_file)
+        with e_col2:
+            if selected_edit_file:
+                full_edit_path = os.path.join(target_dir, selected_edit_file)
             
-            with open(full_edit_path, "r") as f:
-                content = f.read()
+                with open(full_edit_path, "r") as f:
+                    content = f.read()
                 
-            new_content = st_monaco(value=content, height="600px", language="markdown")
+                from streamlit_monaco import st_monaco
+                new_content = st_monaco(value=content, height="600px", language="markdown")
             
-            if st.button("💾 Save Changes"):
-                with open(full_edit_path, "w") as f:
-                    f.write(new_content)
-                st.success(f"Saved {selected_edit_file}")
+                if st.button("💾 Save Changes"):
+                    with open(full_edit_path, "w") as f:
+                        f.write(new_content)
+                    st.success(f"Saved {selected_edit_file}")
 
 # --- TAB 4: SETTINGS ---
 with tab_settings:
-    st.markdown("### ⚙️ Repository Settings")
+    if tab_settings.open:  # Only build the tab the user is looking at
+        st.markdown("### ⚙️ Repository Settings")
     
-    s_col1, s_col2 = st.columns([1, 2])
+        s_col1, s_col2 = st.columns([1, 2])
     
-    repo_setup_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "repository-setup")
+        repo_setup_dir = REPO_SETUP_DIR
     
-    with s_col1:
-        st.markdown("#### Repositories")
-        existing_configs = [f.replace(".md", "") for f in os.listdir(repo_setup_dir) if f.endswith(".md") and f != "TEMPLATE.md"]
-        existing_configs.sort()
+        with s_col1:
+            st.markdown("#### Repositories")
+            existing_configs = [c for c in cached_md_names(repo_setup_dir, dir_mtime(repo_setup_dir)) if c != "TEMPLATE"]
         
-        selected_config = st.selectbox("Select Repository", ["+ Add New"] + existing_configs)
+            selected_config = st.selectbox("Select Repository", ["+ Add New"] + existing_configs)
         
-    with s_col2:
-        st.markdown("#### Configuration")
+        with s_col2:
+            st.markdown("#### Configuration")
         
-        if selected_config == "+ Add New":
-            config_name = st.text_input("Repository Name (ID)", placeholder="my-new-repo")
-            config_data = {}
-            body_content = "# New Repository\n\nDescription here."
-        else:
-            config_name = selected_config
-            full_config_path = os.path.join(repo_setup_dir, f"{selected_config}.md")
-            
-            with open(full_config_path, "r") as f:
-                raw_content = f.read()
-                
-            if raw_content.startswith("---"):
-                try:
-                    _, frontmatter, body_content = raw_content.split("---", 2)
-                    config_data = yaml.safe_load(frontmatter)
-                except ValueError:
-                    config_data = {}
-                    body_content = raw_content
-            else:
+            if selected_config == "+ Add New":
+                config_name = st.text_input("Repository Name (ID)", placeholder="my-new-repo")
                 config_data = {}
-                body_content = raw_content
+                body_content = "# New Repository\n\nDescription here."
+            else:
+                config_name = selected_config
+                full_config_path = os.path.join(repo_setup_dir, f"{selected_config}.md")
+            
+                config_data, body_content = cached_settings_file(full_config_path, os.stat(full_config_path).st_mtime_ns)
 
-        # Form
-        with st.form("repo_settings_form"):
-            path = st.text_input("Local Path", value=config_data.get("path", ""))
-            main_branch = st.text_input("Main Branch", value=config_data.get("main_branch", "main"))
-            remote = st.text_input("Remote", value=config_data.get("remote", "origin"))
+            # Form
+            with st.form("repo_settings_form"):
+                path = st.text_input("Local Path", value=config_data.get("path", ""))
+                main_branch = st.text_input("Main Branch", value=config_data.get("main_branch", "main"))
+                remote = st.text_input("Remote", value=config_data.get("remote", "origin"))
             
-            # Workflows
-            recipes_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prompts", "recipes")
-            available_recipes = [f.replace(".md", "") for f in os.listdir(recipes_dir) if f.endswith(".md")]
+                # Workflows
+                available_recipes = cached_md_names(RECIPES_DIR, dir_mtime(RECIPES_DIR))
             
-            current_workflows = config_data.get("workflows", [])
-            if isinstance(current_workflows, dict):
-                current_workflows = list(current_workflows.keys())
-            elif not isinstance(current_workflows, list):
-                current_workflows = []
+                current_workflows = config_data.get("workflows", [])
+                if isinstance(current_workflows, dict):
+                    current_workflows = list(current_workflows.keys())
+                elif not isinstance(current_workflows, list):
+                    current_workflows = []
                 
-            selected_workflows = st.multiselect("Enabled Workflows", available_recipes, default=[w for w in current_workflows if w in available_recipes])
+                selected_workflows = st.multiselect("Enabled Workflows", available_recipes, default=[w for w in current_workflows if w in available_recipes])
             
-            default_wf_opts = selected_workflows if selected_workflows else ["pr_review"]
-            current_default = config_data.get("default_workflow", "pr_review")
-            default_workflow = st.selectbox("Default Workflow", default_wf_opts, index=default_wf_opts.index(current_default) if current_default in default_wf_opts else 0)
+                default_wf_opts = selected_workflows if selected_workflows else ["pr_review"]
+                current_default = config_data.get("default_workflow", "pr_review")
+                default_workflow = st.selectbox("Default Workflow", default_wf_opts, index=default_wf_opts.index(current_default) if current_default in default_wf_opts else 0)
             
-            # Model
-            current_model = "gemini-1.5-flash"
-            if default_workflow in config_data and isinstance(config_data[default_workflow], dict):
-                 current_model = config_data[default_workflow].get("model", "gemini-1.5-flash")
+                # Model
+                current_model = "gemini-1.5-flash"
+                if default_workflow in config_data and isinstance(config_data[default_workflow], dict):
+                     current_model = config_data[default_workflow].get("model", "gemini-1.5-flash")
             
-            model = st.text_input("Preferred Model", value=current_model)
+                model = st.text_input("Preferred Model", value=current_model)
             
-            body_editor = st.text_area("Description / Notes (Markdown)", value=body_content.strip(), height=200)
+                body_editor = st.text_area("Description / Notes (Markdown)", value=body_content.strip(), height=200)
             
-            submitted = st.form_submit_button("💾 Save Configuration")
+                submitted = st.form_submit_button("💾 Save Configuration")
             
-            if submitted:
-                if not config_name:
-                    st.error("Repository Name is required.")
-                else:
-                    new_config = {
-                        "path": path,
-                        "main_branch": main_branch,
-                        "remote": remote,
-                        "default_workflow": default_workflow,
-                        "workflows": selected_workflows
-                    }
-                    
-                    # Add specific workflow configs
-                    for wf in selected_workflows:
-                        new_config[wf] = {
-                            "prompt": f"prompts/recipes/{wf}.md",
-                            "llm": "gemini",
-                            "model": model
+                if submitted:
+                    if not config_name:
+                        st.error("Repository Name is required.")
+                    else:
+                        new_config = {
+                            "path": path,
+                            "main_branch": main_branch,
+                            "remote": remote,
+                            "default_workflow": default_workflow,
+                            "workflows": selected_workflows
                         }
                     
-                    if config_utils.save_repo_config(config_name, new_config, body_editor):
-                        st.success(f"Saved configuration for {config_name}")
-                        time.sleep(1)
-                        st.rerun()
+                        # Add specific workflow configs
+                        for wf in selected_workflows:
+                            new_config[wf] = {
+                                "prompt": f"prompts/recipes/{wf}.md",
+                                "llm": "gemini",
+                                "model": model
+                            }
+                    
+                        if config_utils.save_repo_config(config_name, new_config, body_editor):
+                            st.success(f"Saved configuration for {config_name}")
+                            time.sleep(1)
+                            st.rerun()
 
 
 
@@ -3,42 +3,74 @@
 Displays file diffs and findings for selected files.
 """
 
+import re
+
 import streamlit as st
-from streamlit_code_diff import st_code_diff
 from scripts import ui_utils
 
+# Files larger than this (either side) are not sent to the browser diff unless asked
+MAX_DIFF_BYTES = 100_000
+MAX_DIFF_LINES = 3000
+
+# Findings whose message matches are shown as high severity
+HIGH_SEVERITY_RE = re.compile(r"security|deprecated", re.IGNORECASE)
+
+
+# Cached on the repo_state fingerprint so reruns don't re-read files or re-run the checker
+@st.cache_data(max_entries=64, show_spinner=False)
+def _file_versions(repo_path, actual_target, actual_source, file_path, repo_state):
+    return tuple(ui_utils.get_file_versions(repo_path, [actual_target, actual_source], file_path))
+
 
-def render_diff_viewer(repo_path, actual_target, actual_source):
+@st.cache_data(max_entries=16, show_spinner=False)
+def _findings(repo_path, actual_target, actual_source, target_commit, source_commit, repo_state):
+    findings = ui_utils.get_findings(repo_path, actual_target, actual_source, target_commit, source_commit)
+    # Classified once per cache entry rather than on every rerun
+    return [dict(f, severity="high" if HIGH_SEVERITY_RE.search(f['message']) else "med") for f in findings]
+
+
+def render_diff_viewer(repo_path, actual_target, actual_source, repo_state):
     """Render the diff viewer component.
 
     Args:
         repo_path: Path to the git repository
         actual_target: Target ref for comparison
         actual_source: Source ref for comparison
+        repo_state: ui_utils.get_repo_state fingerprint, keys the cached lookups
     """
     if st.session_state.selected_file:
         st.markdown(f"### 📝 Diff: `{st.session_state.selected_file}`")
         st.caption(f"Comparing: `{actual_target}` ↔ `{actual_source}`")
 
-        before = ui_utils.get_file_content(repo_path, actual_target, st.session_state.selected_file)
-        after = ui_utils.get_file_content(repo_path, actual_source, st.session_state.selected_file)
+        before, after = _file_versions(repo_path, actual_target, actual_source,
+                                       st.session_state.selected_file, repo_state)
+
+        selected_file = st.session_state.selected_file
+        too_large = (max(len(before), len(after)) > MAX_DIFF_BYTES
+                     or max(before.count("\n"), after.count("\n")) > MAX_DIFF_LINES)
 
         # Check if content is identical after normalization
         if before == after:
             st.info("File content is identical (ignoring line endings).")
             with st.expander("Show Content"):
                 st.code(after)
+        elif too_large and selected_file not in st.session_state.force_render:
+            st.warning(f"File too large to diff in the browser "
+                       f"({len(before):,} → {len(after):,} bytes). Rendering was skipped.")
+            if st.button("Load anyway", key="force_render_diff"):
+                st.session_state.force_render.add(selected_file)
+                st.rerun()
         else:
+            from streamlit_code_diff import st_code_diff  # Only needed once a file is picked
             st_code_diff(before, after)
 
         # Context Tower (Findings) moved here for relevance
-        findings = ui_utils.get_findings(repo_path, actual_target, actual_source,
-                                       st.session_state.target_commit, st.session_state.source_commit)
+        findings = _findings(repo_path, actual_target, actual_source,
+                             st.session_state.target_commit, st.session_state.source_commit, repo_state)
         if findings:
             with st.expander(f"🚨 Rule Findings ({len(findings)})", expanded=False):
                 for f in findings:
-                    sev = "high" if "security" in f['message'].lower() or "deprecated" in f['message'].lower() else "med"
-                    st.markdown(f'<div class="finding-alert finding-{sev}"><b>{f["type"].upper()}</b>: {f["message"]}</div>',
+                    st.markdown(f'<div class="finding-alert finding-{f["severity"]}"><b>{f["type"].upper()}</b>: {f["message"]}</div>',
                               unsafe_allow_html=True)
     else:
         st.info("Select a file from the tree to view the diff.")
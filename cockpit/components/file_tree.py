@@ -4,18 +4,28 @@ Provides an interactive file tree for selecting files to view diffs.
 """
 
 import streamlit as st
-import streamlit_antd_components as sac
 from scripts import ui_utils
 
+# Above this many files the tree widget gets slow to mount; use one flat selectbox instead
+MAX_TREE_FILES = 500
 
-def render_file_tree(repo_path, actual_target, actual_source, changed_files):
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _content_changed_files(repo_path, target, source, target_commit, source_commit, repo_state):
+    return set(ui_utils.get_content_changed_files(repo_path, target, source, target_commit, source_commit))
+
+
+def render_file_tree(repo_path, target, source, target_commit, source_commit, changed_files, repo_state):
     """Render the interactive file tree component.
 
     Args:
         repo_path: Path to the git repository
-        actual_target: Target ref for comparison
-        actual_source: Source ref for comparison
+        target: Target branch, as selected (resolved like get_changed_files does)
+        source: Source branch or "Working Directory"
+        target_commit: Selected target commit, or None
+        source_commit: Selected source commit, or None
         changed_files: List of changed files
+        repo_state: ui_utils.get_repo_state fingerprint, keys the cached git lookup
 
     Returns:
         None - updates session state directly
@@ -32,71 +42,44 @@ def render_file_tree(repo_path, actual_target, actual_source, changed_files):
     # 1. Filter by text
     text_filtered = [f for f in changed_files if filter_text.lower() in f.lower()] if filter_text else changed_files
 
-    # 2. Filter by content (remove identicals)
-    final_files = []
-    # We use a spinner because this might take a moment for many files
-    with st.spinner("Verifying actual changes..."):
-        for f in text_filtered:
-            b = ui_utils.get_file_content(repo_path, actual_target, f)
-            a = ui_utils.get_file_content(repo_path, actual_source, f)
-            if b != a:
-                final_files.append(f)
+    # 2. Filter by content (remove identicals) with a single git call
+    content_changed = _content_changed_files(repo_path, target, source, target_commit, source_commit, repo_state)
+    final_files = [f for f in text_filtered if f in content_changed]
 
     if not final_files:
         st.success("No content changes detected (files may differ only by line endings).")
         return
 
-    # Build Tree Structure & Label Map
+    if len(final_files) > MAX_TREE_FILES:
+        _render_file_select(sorted(final_files))
+        return
+
+    import streamlit_antd_components as sac  # Only needed once there is a tree to draw
+
+    # Build Tree Structure & Label Map in one pass over the sorted paths
     tree_items = []
     label_map = {}  # label -> full_path
-
-    def get_unique_label(base_label):
-        label = base_label
-        counter = 0
-        while label in label_map:
-            counter += 1
-            label = base_label + "\u200b" * counter
-        return label
-
-    def add_to_tree(nodes, parts, full_path):
-        part = parts[0]
-        is_file = len(parts) == 1
-
-        # Find existing node (by visual label, ignoring ZWS for matching parent folders)
-        existing_node = None
-        for node in nodes:
-            # Strip ZWS to match folder names correctly
-            if node.label.rstrip('\u200b') == part and ((is_file and node.icon == 'file-code') or (not is_file and node.icon == 'folder')):
-                existing_node = node
-                break
-
-        if existing_node:
-            if is_file:
-                pass
-            else:
-                add_to_tree(existing_node.children, parts[1:], full_path)
-        else:
-            # Create new node
-            if is_file:
-                unique_label = get_unique_label(part)
-                new_node = sac.TreeItem(unique_label, icon='file-code')
-                nodes.append(new_node)
-                label_map[unique_label] = full_path
-            else:
-                # Folders also need unique labels in the map if we want to be safe,
-                # but usually we don't select folders.
-                # However, we need to store them in the tree.
-                # We don't add folders to label_map for file selection,
-                # but we need to ensure their labels are unique in the tree if they are siblings?
-                # Actually, sibling folders with same name are impossible.
-                # So folder labels are unique among siblings.
-                new_node = sac.TreeItem(part, icon='folder', children=[])
-                nodes.append(new_node)
-                add_to_tree(new_node.children, parts[1:], full_path)
-
-    for f in sorted(final_files):
-        parts = f.split('/')
-        add_to_tree(tree_items, parts, f)
+    folders = {}  # folder path -> its children list, so siblings are never scanned
+    label_counts = {}  # file name -> times used; repeats get zero-width spaces appended
+
+    for f in sorted(set(final_files)):
+        *dirs, name = f.split('/')
+        children = tree_items
+        folder_path = ""
+        for part in dirs:
+            folder_path += part + "/"
+            if folder_path not in folders:
+                folder = sac.TreeItem(part, icon='folder', children=[])
+                children.append(folder)
+                folders[folder_path] = folder.children
+            children = folders[folder_path]
+
+        # Labels must be unique across the whole tree for selection to map back
+        count = label_counts.get(name, 0)
+        label_counts[name] = count + 1
+        unique_label = name + "\u200b" * count
+        children.append(sac.TreeItem(unique_label, icon='file-code'))
+        label_map[unique_label] = f
 
     # Render SAC Tree
     selected_label = sac.tree(
@@ -129,4 +112,22 @@ def render_file_tree(repo_path, actual_target, actual_source, changed_files):
                 st.rerun()
         elif target_label:
             # It might be a folder or unmapped item
-            pass
\ No newline at end of file
+            pass
+
+
+def _render_file_select(files):
+    """Flat file picker for large change sets (one virtualized, searchable widget).
+
+    Shows full paths: sorted, they stay grouped by folder and the search box
+    matches on directory names too.
+    """
+    current = st.session_state.selected_file
+    selected = st.selectbox(
+        f"{len(files)} files",
+        files,
+        index=files.index(current) if current in files else None,
+        placeholder="Select a file...",
+    )
+    if selected and selected != current:
+        st.session_state.selected_file = selected
+        st.rerun()
@@ -8,11 +8,14 @@ import os
 import sys
 import subprocess
 import json
-import tempfile
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from dotenv import load_dotenv
 
+if not __package__:  # Run as `python scripts/call_copilot_cli.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.cli_utils import memoize_probe, stream_process
+
 load_dotenv()
 
 # Default model (Claude Sonnet 4.5 as of Dec 2025)
@@ -34,9 +37,13 @@ class CopilotAuthError(CopilotError):
     pass
 
 
+@memoize_probe
 def is_copilot_installed() -> bool:
     """Check if GitHub Copilot CLI is installed and available.
     
+    The probe spawns a subprocess, so the result is cached (see
+    cli_utils.memoize_probe). Use ``is_copilot_installed.cache_clear()`` to re-probe.
+    
     Returns:
         True if 'copilot' command is available in PATH
     """
@@ -52,6 +59,32 @@ def is_copilot_installed() -> bool:
         return False
 
 
+# Environment variables the Copilot CLI accepts a GitHub token from, in its lookup order.
+# Only the first is Copilot-specific; GH_TOKEN/GITHUB_TOKEN are common in CI and
+# shells without Copilot access, so they do not count as stored credentials.
+COPILOT_TOKEN_ENV_VARS = ("COPILOT_GITHUB_TOKEN", "GH_TOKEN", "GITHUB_TOKEN")
+
+
+def has_stored_credentials() -> bool:
+    """Check for Copilot CLI credentials without running the CLI.
+
+    True if ``COPILOT_GITHUB_TOKEN`` is set or the CLI's config file
+    (``~/.copilot/config.json``, under ``$XDG_CONFIG_HOME`` if set) records
+    a logged-in user. Generic GitHub tokens are not enough on their own.
+    """
+    if os.environ.get("COPILOT_GITHUB_TOKEN"):
+        return True
+
+    config_home = os.environ.get("XDG_CONFIG_HOME") or Path.home()
+    try:
+        with open(Path(config_home) / ".copilot" / "config.json", encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(config, dict) and bool(config.get("logged_in_users") or config.get("last_logged_in_user"))
+
+
+@memoize_probe
 def check_authentication() -> bool:
     """Verify that Copilot CLI is authenticated.
     
@@ -60,11 +93,18 @@ def check_authentication() -> bool:
         
     Note:
         The new Copilot CLI doesn't have a dedicated auth check command.
-        This attempts a minimal operation to verify authentication.
+        Stored credentials (see has_stored_credentials) are trusted as is;
+        only without them is a minimal prompt sent to verify authentication.
+        A successful result is cached for the process and a failed one for
+        cli_utils.PROBE_RETRY_SECONDS; ``check_authentication.cache_clear()`` re-probes
+        immediately.
     """
     if not is_copilot_installed():
         return False
     
+    if has_stored_credentials():
+        return True
+    
     try:
         # Try a simple prompt to verify authentication
         result = subprocess.run(
@@ -80,6 +120,31 @@ def check_authentication() -> bool:
         return False
 
 
+def _build_command(
+    allow_tools: Optional[list[str]],
+    deny_tools: Optional[list[str]],
+    allow_all_tools: bool
+) -> list[str]:
+    """Build the copilot command line shared by call_copilot and call_copilot_stream.
+
+    The prompt itself is always sent on stdin.
+    """
+    cmd = ['copilot']
+    
+    # Add tool permissions
+    if allow_all_tools:
+        cmd.append('--allow-all-tools')
+    else:
+        if allow_tools:
+            for tool in allow_tools:
+                cmd.extend(['--allow-tool', tool])
+        
+        if deny_tools:
+            for tool in deny_tools:
+                cmd.extend(['--deny-tool', tool])
+    return cmd
+
+
 def call_copilot(
     prompt: str,
     allow_tools: Optional[list[str]] = None,
@@ -104,6 +169,39 @@ def call_copilot(
         CopilotAuthError: If Copilot CLI is not authenticated
         CopilotError: If the API call fails
     """
+    return "".join(call_copilot_stream(
+        prompt,
+        allow_tools=allow_tools,
+        deny_tools=deny_tools,
+        allow_all_tools=allow_all_tools,
+        timeout=timeout
+    )).strip()
+
+
+def call_copilot_stream(
+    prompt: str,
+    allow_tools: Optional[list[str]] = None,
+    deny_tools: Optional[list[str]] = None,
+    allow_all_tools: bool = False,
+    timeout: int = 300
+) -> Iterator[str]:
+    """Call GitHub Copilot CLI and yield its output line by line as it is printed.
+    
+    call_copilot joins this output; lines are yielded as the CLI prints them
+    (see cli_utils.stream_process). Authentication problems reported on
+    stderr, and failed exits, are raised once the CLI exits.
+    
+    Args:
+        Same as call_copilot
+        
+    Yields:
+        Lines of Copilot's response text, newlines included
+        
+    Raises:
+        CopilotNotInstalledError: If Copilot CLI is not installed
+        CopilotAuthError: If Copilot CLI is not authenticated
+        CopilotError: If the call fails or times out
+    """
     if not prompt.strip():
         raise ValueError("Empty prompt provided")
     
@@ -113,59 +211,47 @@ def call_copilot(
             "Install it from: https://docs.github.com/en/copilot/how-tos/set-up/install-copilot-cli"
         )
     
-    # Build command - use stdin for large prompts to avoid argument list too long error
-    cmd = ['copilot']
-    
-    # Add tool permissions
-    if allow_all_tools:
-        cmd.append('--allow-all-tools')
-    else:
-        if allow_tools:
-            for tool in allow_tools:
-                cmd.extend(['--allow-tool', tool])
-        
-        if deny_tools:
-            for tool in deny_tools:
-                cmd.extend(['--deny-tool', tool])
+    cmd = _build_command(allow_tools, deny_tools, allow_all_tools)
     
+    process = stream_process(cmd, prompt, timeout, cwd=os.getcwd())
+    output = []  # Kept for the error message if the CLI fails
     try:
-        result = subprocess.run(
-            cmd,
-            input=prompt,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=os.getcwd()
-        )
-        
-        # Check for auth error in stderr even if return code is 0 (Copilot CLI quirk)
-        if 'No authentication information found' in result.stderr or 'authenticate' in result.stderr.lower():
-             raise CopilotAuthError(
-                f"Copilot CLI authentication failed. Please authenticate.\n{result.stderr}"
-            )
-        
-        if result.returncode != 0:
-            error_msg = result.stderr.strip()
-            
-            # Check for authentication errors
-            if 'authenticate' in error_msg.lower() or 'unauthorized' in error_msg.lower():
-                raise CopilotAuthError(
-                    f"Copilot CLI authentication failed. Please authenticate.\n{error_msg}"
-                )
-            
-            # Generic error
-            raise CopilotError(
-                f"Copilot CLI failed with exit code {result.returncode}:\n"
-                f"STDERR: {error_msg}\n"
-                f"STDOUT: {result.stdout.strip()}"
-            )
-        
-        return result.stdout.strip()
-        
+        while True:
+            try:
+                line = next(process)
+            except StopIteration as done:
+                returncode, stderr = done.value
+                break
+            output.append(line)
+            yield line
     except subprocess.TimeoutExpired:
         raise CopilotError(f"Copilot CLI timed out after {timeout} seconds")
     except FileNotFoundError:
         raise CopilotNotInstalledError("Copilot CLI executable not found in PATH")
+    finally:
+        process.close()  # Kills the CLI if the consumer stopped reading early
+    
+    # Check for auth error in stderr even if return code is 0 (Copilot CLI quirk)
+    if 'No authentication information found' in stderr or 'authenticate' in stderr.lower():
+        raise CopilotAuthError(
+            f"Copilot CLI authentication failed. Please authenticate.\n{stderr}"
+        )
+    
+    if returncode != 0:
+        error_msg = stderr.strip()
+        
+        # Check for authentication errors
+        if 'unauthorized' in error_msg.lower():
+            raise CopilotAuthError(
+                f"Copilot CLI authentication failed. Please authenticate.\n{error_msg}"
+            )
+        
+        # Generic error
+        raise CopilotError(
+            f"Copilot CLI failed with exit code {returncode}:\n"
+            f"STDERR: {error_msg}\n"
+            f"STDOUT: {''.join(output).strip()}"
+        )
 
 
 def call_with_file(
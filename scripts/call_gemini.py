@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """scripts/call_gemini.py - Gemini API with specific error handling"""
-import os, sys, time
+import os, sys, time, functools
 from google import genai
 from google.api_core import exceptions
 from dotenv import load_dotenv
@@ -13,6 +13,11 @@ def get_client(api_key=None):
     key = api_key or os.environ.get('GEMINI_API_KEY')
     if not key:
         raise ValueError("GEMINI_API_KEY not found in environment")
+    return _client_for_key(key)
+
+@functools.lru_cache(maxsize=4)
+def _client_for_key(key):
+    # Reusing the client keeps its HTTP connection pool (and TLS sessions) alive across calls
     return genai.Client(api_key=key)
 
 def list_models(client=None):
@@ -67,6 +72,42 @@ def call_with_retry(prompt: str, client=None, model=None) -> str:
         except Exception as e:
             raise RuntimeError(f"Unexpected error: {e}")
 
+def stream_with_retry(prompt: str, client=None, model=None):
+    """Like call_with_retry, but yields the response text as it is generated.
+
+    Transient errors are only retried before the first chunk arrives.
+    """
+    if not prompt.strip():
+        raise ValueError("Empty prompt")
+    
+    if client is None:
+        client = get_client()
+    
+    target_model = model or MODEL
+    
+    for attempt in range(MAX_RETRIES):
+        started = False
+        try:
+            for chunk in client.models.generate_content_stream(model=target_model, contents=prompt):
+                text = chunk.text  # A property that joins the chunk's parts on every access
+                if text:
+                    started = True
+                    yield text
+            return
+        except exceptions.InvalidArgument as e:
+            raise ValueError(f"Invalid Argument (prompt issue?): {e}")
+        except exceptions.Unauthenticated as e:
+            raise PermissionError(f"API Key Invalid: {e}")
+        except (exceptions.ResourceExhausted, exceptions.ServiceUnavailable) as e:
+            if attempt < MAX_RETRIES - 1 and not started:
+                wait = 2 ** attempt
+                print(f"[WARN] {type(e).__name__}, retry in {wait}s...", file=sys.stderr)
+                time.sleep(wait)
+            else:
+                raise RuntimeError(f"Max retries: {e}")
+        except Exception as e:
+            raise RuntimeError(f"Unexpected error: {e}")
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: call_gemini.py [--count-tokens] <prompt_file> [output_file]")
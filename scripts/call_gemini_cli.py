@@ -8,17 +8,24 @@ import os
 import sys
 import subprocess
 import json
-import tempfile
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from dotenv import load_dotenv
 import shutil
 
+if not __package__:  # Run as `python scripts/call_gemini_cli.py`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.cli_utils import memoize_probe, stream_process
+
 load_dotenv()
 
 # Default model (Gemini 2.0 Flash as of Dec 2025)
 DEFAULT_MODEL = "gemini-3-flash-preview"
 
+# Environment for every gemini run: colors and thinking disabled. Built once,
+# after load_dotenv(); nothing in this project changes os.environ later.
+_GEMINI_ENV = dict(os.environ, FORCE_COLOR='0', NO_THINKING='1')
+
 
 class GeminiCLIError(Exception):
     """Raised when Gemini CLI operations fail."""
@@ -35,13 +42,33 @@ class GeminiCLIAuthError(GeminiCLIError):
     pass
 
 
+@memoize_probe
+def _gemini_path() -> Optional[str]:
+    """Full path of the 'gemini' executable.
+
+    A found path is kept for the process; a miss is re-searched after
+    cli_utils.PROBE_RETRY_SECONDS, so installing the CLI later is noticed.
+    """
+    return shutil.which('gemini')
+
+
+def _invalidate_cli_cache() -> None:
+    """Forget the cached executable path and install probe (e.g. after installing the CLI)."""
+    _gemini_path.cache_clear()
+    is_gemini_cli_installed.cache_clear()
+
+
+@memoize_probe
 def is_gemini_cli_installed() -> bool:
     """Check if Google Gemini CLI is installed and available.
 
+    The probe spawns a subprocess, so the result is cached (see
+    cli_utils.memoize_probe). Use ``_invalidate_cli_cache()`` to re-probe.
+
     Returns:
         True if 'gemini' command is available in PATH
     """
-    gemini_path = shutil.which('gemini')
+    gemini_path = _gemini_path()
     if gemini_path:
         try:
             result = subprocess.run(
@@ -59,73 +86,41 @@ def is_gemini_cli_installed() -> bool:
 def is_gemini_cli_authenticated() -> bool:
     """Verify that Gemini CLI is authenticated.
 
+    Gemini CLI has no auth check command; if it can run basic commands
+    (``gemini --version``), assume it's authenticated. That is the same probe
+    as is_gemini_cli_installed, so its cached result is reused.
+
     Returns:
         True if authenticated, False otherwise
     """
-    gemini_path = shutil.which('gemini')
-    if not gemini_path:
-        return False
-
-    try:
-        # Try to run gemini with --version to check if it's working
-        # If it can run basic commands, assume it's authenticated
-        result = subprocess.run(
-            [gemini_path, '--version'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return result.returncode == 0
-    except (subprocess.TimeoutExpired, OSError):
-        return False
-
+    return is_gemini_cli_installed()
 
-def call_gemini_cli(
-    prompt: str,
-    model: Optional[str] = None,
-    allow_tools: Optional[list[str]] = None,
-    deny_tools: Optional[list[str]] = None,
-    allow_all_tools: bool = False,
-    timeout: int = 300
-) -> str:
-    """Call Google Gemini CLI with a prompt in programmatic mode.
 
-    Args:
-        prompt: The prompt to send to Gemini CLI
-        model: Model to use (optional, uses default if not specified)
-        allow_tools: List of tools to allow without approval
-        deny_tools: List of tools to deny
-        allow_all_tools: If True, allow all tools without approval (DANGEROUS)
-        timeout: Timeout in seconds (default: 300)
+def _build_command(
+    model: Optional[str],
+    allow_tools: Optional[list[str]],
+    allow_all_tools: bool,
+    output_format: str
+) -> list[str]:
+    """Build the gemini command line shared by call_gemini_cli and stream_gemini_cli.
 
     Returns:
-        Gemini CLI's response text
+        The command; the prompt itself is always sent on stdin
 
     Raises:
         GeminiCLINotInstalledError: If Gemini CLI is not installed
-        GeminiCLIAuthError: If authentication fails
-        GeminiCLIError: For other CLI errors
     """
     if not is_gemini_cli_installed():
         raise GeminiCLINotInstalledError("Gemini CLI is not installed or not in PATH")
 
     # Get the full path to gemini
-    gemini_path = shutil.which('gemini')
+    gemini_path = _gemini_path()
     if not gemini_path:
         raise GeminiCLINotInstalledError("Gemini CLI is not installed or not in PATH")
 
-    # Build command - use positional argument for the prompt
-    # For very long prompts, we might need to use stdin, but try positional first
-    MAX_ARG_LENGTH = 131072  # 128KB limit for command line arguments
-    
-    if len(prompt) > MAX_ARG_LENGTH:
-        # For extremely long prompts, use stdin
-        cmd = [gemini_path]
-        input_text = prompt
-    else:
-        # Use positional argument for normal prompts
-        cmd = [gemini_path, prompt]
-        input_text = None
+    # Build command - the prompt goes on stdin, never in argv (no ARG_MAX limit,
+    # and it doesn't show up in `ps`)
+    cmd = [gemini_path]
 
     # Add model if specified
     if model:
@@ -149,28 +144,64 @@ def call_gemini_cli(
         if allowed:
             cmd.extend(['--allowed-tools', ','.join(allowed)])
 
-    # Set output format to json for programmatic use (might avoid thinking issues)
-    cmd.extend(['-o', 'json'])
+    # Set output format ('json' for programmatic use, 'text' when streaming)
+    cmd.extend(['-o', output_format])
     
     # Set approval mode to auto_edit to avoid thinking features
     cmd.extend(['--approval-mode', 'auto_edit'])
 
+    return cmd
+
+
+def _cli_error(stderr: str) -> GeminiCLIError:
+    """Map a failed run's stderr to the matching GeminiCLIError."""
+    lowered = stderr.lower()
+    if 'auth' in lowered or 'authenticate' in lowered or 'login' in lowered:
+        return GeminiCLIAuthError(f"Gemini CLI authentication failed: {stderr}")
+    return GeminiCLIError(f"Gemini CLI error: {stderr}")
+
+
+def call_gemini_cli(
+    prompt: str,
+    model: Optional[str] = None,
+    allow_tools: Optional[list[str]] = None,
+    deny_tools: Optional[list[str]] = None,
+    allow_all_tools: bool = False,
+    timeout: int = 300
+) -> str:
+    """Call Google Gemini CLI with a prompt in programmatic mode.
+
+    Args:
+        prompt: The prompt to send to Gemini CLI
+        model: Model to use (optional, uses default if not specified)
+        allow_tools: List of tools to allow without approval
+        deny_tools: List of tools to deny
+        allow_all_tools: If True, allow all tools without approval (DANGEROUS)
+        timeout: Timeout in seconds (default: 300)
+
+    Returns:
+        Gemini CLI's response text
+
+    Raises:
+        GeminiCLINotInstalledError: If Gemini CLI is not installed
+        GeminiCLIAuthError: If authentication fails
+        GeminiCLIError: For other CLI errors
+    """
+    # Set output format to json for programmatic use (might avoid thinking issues)
+    cmd = _build_command(model, allow_tools, allow_all_tools, 'json')
+
     try:
         result = subprocess.run(
             cmd,
-            input=input_text,
+            input=prompt,
             capture_output=True,
             text=True,
             timeout=timeout,
-            env=dict(os.environ, FORCE_COLOR='0', NO_THINKING='1')  # Disable colors and thinking
+            env=_GEMINI_ENV
         )
 
         if result.returncode != 0:
-            stderr = result.stderr.lower()
-            if 'auth' in stderr or 'authenticate' in stderr or 'login' in stderr:
-                raise GeminiCLIAuthError(f"Gemini CLI authentication failed: {result.stderr}")
-            else:
-                raise GeminiCLIError(f"Gemini CLI error: {result.stderr}")
+            raise _cli_error(result.stderr)
 
         # Parse JSON output
         try:
@@ -194,6 +225,42 @@ def call_gemini_cli(
         raise GeminiCLINotInstalledError("Gemini CLI command not found")
 
 
+def stream_gemini_cli(
+    prompt: str,
+    model: Optional[str] = None,
+    allow_tools: Optional[list[str]] = None,
+    deny_tools: Optional[list[str]] = None,
+    allow_all_tools: bool = False,
+    timeout: int = 300
+) -> Iterator[str]:
+    """Call Google Gemini CLI and yield its text output line by line as it is printed.
+
+    Unlike call_gemini_cli, the output is never buffered whole in memory
+    (see cli_utils.stream_process).
+
+    Args:
+        Same as call_gemini_cli
+
+    Yields:
+        Lines of Gemini CLI's response text, newlines included
+
+    Raises:
+        GeminiCLINotInstalledError: If Gemini CLI is not installed
+        GeminiCLIAuthError: If authentication fails
+        GeminiCLIError: For other CLI errors, including timeouts
+    """
+    cmd = _build_command(model, allow_tools, allow_all_tools, 'text')
+
+    try:
+        returncode, stderr = yield from stream_process(cmd, prompt, timeout, env=_GEMINI_ENV)
+    except subprocess.TimeoutExpired:
+        raise GeminiCLIError(f"Gemini CLI timed out after {timeout} seconds")
+    except FileNotFoundError:
+        raise GeminiCLINotInstalledError("Gemini CLI command not found")
+    if returncode != 0:
+        raise _cli_error(stderr)
+
+
 def get_available_models() -> list[str]:
     """Get list of available models from Gemini CLI.
 
@@ -0,0 +1,101 @@
+"""Subprocess helpers shared by the LLM command-line integrations.
+
+Used by call_gemini_cli.py and call_copilot_cli.py.
+"""
+
+import functools
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Generator, Tuple
+
+# Seconds before a failed install/auth probe is run again
+PROBE_RETRY_SECONDS = 30
+
+
+def memoize_probe(probe):
+    """Cache a probe's result: a truthy one for the process, a falsy one for PROBE_RETRY_SECONDS.
+
+    Installing or logging in to a CLI after a failed check is picked up
+    without restarting a long-lived process such as the cockpit, while a
+    failing probe still isn't re-run on every call. ``cache_clear()`` forces
+    a re-probe.
+    """
+    lock = threading.Lock()
+    cached = {}
+
+    @functools.wraps(probe)
+    def wrapper():
+        with lock:  # Concurrent callers share one probe run
+            if cached and (cached["result"] or time.monotonic() < cached["retry_at"]):
+                return cached["result"]
+            result = probe()
+            cached.update(result=result, retry_at=time.monotonic() + PROBE_RETRY_SECONDS)
+            return result
+
+    wrapper.cache_clear = cached.clear
+    return wrapper
+
+
+def stream_process(cmd: list[str], prompt: str, timeout: float,
+                   **popen_kwargs) -> Generator[str, None, Tuple[int, str]]:
+    """Run cmd with prompt on stdin and yield its stdout line by line as it is printed.
+
+    stderr goes to a temporary file so a chatty command cannot fill the pipe
+    and stall the run. Once the command exits, the generator returns
+    ``(returncode, stderr)``; read it with ``result = yield from stream_process(...)``.
+    If the consumer stops reading early, the command is killed.
+
+    Args:
+        cmd: Command line to run
+        prompt: Text sent on stdin (never in argv: no ARG_MAX limit, not shown in `ps`)
+        timeout: Seconds before the command is killed
+        **popen_kwargs: Extra subprocess.Popen arguments (env, cwd, ...)
+
+    Yields:
+        Lines of stdout, newlines included
+
+    Raises:
+        FileNotFoundError: If the executable does not exist
+        subprocess.TimeoutExpired: If the command ran past timeout and was killed
+    """
+    with tempfile.TemporaryFile(mode='w+') as stderr_file:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True,
+            bufsize=1,
+            **popen_kwargs
+        )
+
+        # The output loop has no timeout of its own; kill the command from a timer instead
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.start()
+        try:
+            try:
+                proc.stdin.write(prompt)
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass  # Command exited early; its exit status says why
+            yield from proc.stdout
+            proc.wait()
+        finally:
+            timer.cancel()
+            if proc.poll() is None:  # Consumer stopped reading early
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        stderr_file.seek(0)
+        return proc.returncode, stderr_file.read()
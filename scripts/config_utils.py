@@ -1,25 +1,60 @@
 import yaml
 import os
+import re
+import copy
+import functools
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# "---" front matter block at the top of a config file, then the markdown body
+_FRONTMATTER_RE = re.compile(r"\A---[ \t]*\r?\n(.*?)^---[ \t]*(?:\r?\n|\Z)(.*)", re.S | re.M)
 
 def load_repo_config(repo_name):
-    """Load repository configuration from repository-setup/<name>.md."""
+    """Load repository configuration from repository-setup/<name>.md.
+
+    Parsed configs are cached per file and invalidated when the file's
+    mtime or size changes, so repeated loads skip the read + YAML parse.
+    Each caller gets its own copy of the config dict.
+    """
     path = f"repository-setup/{repo_name}.md"
-    if not os.path.exists(path):
+    try:
+        st = os.stat(path)
+    except OSError:
         return None
-    
+
+    config = _parse_config_file(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    return copy.deepcopy(config)
+
+@functools.lru_cache(maxsize=64)
+def _parse_config_file(path, mtime_ns, size):
+    """Read and parse a repo config's front matter (cached by load_repo_config)."""
     try:
         with open(path, 'r', encoding='utf-8') as f:
             content = f.read()
             
         # Parse frontmatter
         if content.startswith('---'):
-            _, frontmatter, _ = content.split('---', 2)
-            config = yaml.safe_load(frontmatter)
+            config, _ = split_front_matter(content)
             return config
     except Exception as e:
+        repo_name = os.path.basename(path).replace(".md", "")
         print(f"[ERROR] Failed to load config for {repo_name}: {e}")
     return None
 
+def split_front_matter(content):
+    """Split a config file's text into (front-matter dict, markdown body).
+
+    Files without a closed front matter block come back as ({}, content).
+    """
+    m = _FRONTMATTER_RE.match(content)
+    if not m:
+        return {}, content
+    return yaml.load(m.group(1), Loader=_YamlLoader) or {}, m.group(2)
+
 def get_workflows(config):
     """Extract list of available workflows from config."""
     if not config:
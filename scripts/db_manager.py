@@ -4,6 +4,9 @@ import sys
 import os
 import json
 import argparse
+import atexit
+import queue
+import threading
 from typing import Optional, List, Dict, Any
 
 # Database path: repo_root/data/history.sqlite
@@ -11,16 +14,56 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 REPO_ROOT = os.path.dirname(SCRIPT_DIR)
 DB_PATH = os.path.join(REPO_ROOT, 'data', 'history.sqlite')
 
+_INSERT_SQL = '''INSERT INTO analysis_history 
+                 (diff_hash, prompt_hash, model, response, cost, repo_name, summary, tags, entry_type, config_snapshot) 
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+# One long-lived connection per database file, shared across threads.
+# Every use goes through _lock so statements from different threads don't interleave.
+_lock = threading.RLock()
+_connections = {}
+_initialized = set()
+
+# save_cache_async hands rows to a single background writer thread
+_write_queue = queue.Queue()
+_writer = None
+
 def get_db_connection():
-    """Establishes a database connection."""
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Return the shared connection for DB_PATH, opening it on first use.
+
+    The connection stays open for the life of the process (callers must not
+    close it) and runs in WAL mode with synchronous=NORMAL, so each commit
+    costs one fsync at most. It is reopened if the database file disappears.
+    """
+    with _lock:
+        conn = _connections.get(DB_PATH)
+        if conn is not None and not os.path.exists(DB_PATH):
+            conn.close()
+            conn = None
+            _initialized.discard(DB_PATH)
+        if conn is None:
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _connections[DB_PATH] = conn
+        return conn
 
 def init_db():
-    """Initialize the SQLite database and schema with versioning."""
-    conn = get_db_connection()
+    """Initialize the SQLite database and schema with versioning.
+
+    Runs the migrations once per database file per process.
+    """
+    with _lock:
+        conn = get_db_connection()
+        if DB_PATH in _initialized:
+            return
+        _init_schema(conn)
+        _initialized.add(DB_PATH)
+
+def _init_schema(conn):
+    """Create the schema and apply pending migrations (called by init_db)."""
     c = conn.cursor()
     
     # Create schema version table
@@ -45,7 +88,6 @@ def init_db():
                  (2, 'Add config_snapshot and enhanced columns'))
     
     conn.commit()
-    conn.close()
 
 def _apply_migration_v1(c):
     """Apply version 1: Initial schema."""
@@ -112,14 +154,12 @@ def get_cache(diff_hash: str, prompt_hash: str, model: str) -> Optional[str]:
     if not os.path.exists(DB_PATH):
         return None
         
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute('''SELECT response FROM analysis_history 
+    with _lock:
+        c = get_db_connection().execute('''SELECT response FROM analysis_history 
                  WHERE diff_hash=? AND prompt_hash=? AND model=? 
                  ORDER BY timestamp DESC LIMIT 1''',
               (diff_hash, prompt_hash, model))
-    row = c.fetchone()
-    conn.close()
+        row = c.fetchone()
     return row['response'] if row else None
 
 def get_context(repo_name: str, limit: int = 3, search_query: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -127,34 +167,33 @@ def get_context(repo_name: str, limit: int = 3, search_query: Optional[str] = No
     if not os.path.exists(DB_PATH):
         return [{"status": "no_history", "message": "<!-- No relevant historical reviews found (DB missing) -->"}]
         
-    conn = get_db_connection()
-    c = conn.cursor()
+    with _lock:
+        c = get_db_connection().cursor()
     
-    query_base = "SELECT id, timestamp, model, response, summary, tags, entry_type FROM analysis_history"
+        query_base = "SELECT id, timestamp, model, response, summary, tags, entry_type FROM analysis_history"
     
-    if search_query:
-        # Search using FTS5
-        try:
-            c.execute('''SELECT h.id, h.timestamp, h.model, h.response, h.summary, h.tags, h.entry_type 
-                         FROM analysis_history h
-                         JOIN analysis_history_fts f ON h.id = f.rowid
-                         WHERE h.repo_name=? AND analysis_history_fts MATCH ?
-                         ORDER BY (h.entry_type = 'agent_session') DESC, rank LIMIT ?''',
-                      (repo_name, search_query, limit))
-        except sqlite3.OperationalError:
-            # Fallback
+        if search_query:
+            # Search using FTS5
+            try:
+                c.execute('''SELECT h.id, h.timestamp, h.model, h.response, h.summary, h.tags, h.entry_type 
+                             FROM analysis_history h
+                             JOIN analysis_history_fts f ON h.id = f.rowid
+                             WHERE h.repo_name=? AND analysis_history_fts MATCH ?
+                             ORDER BY (h.entry_type = 'agent_session') DESC, rank LIMIT ?''',
+                          (repo_name, search_query, limit))
+            except sqlite3.OperationalError:
+                # Fallback
+                c.execute(f'''{query_base} 
+                             WHERE repo_name=? AND (summary LIKE ? OR tags LIKE ?)
+                             ORDER BY (entry_type = 'agent_session') DESC, timestamp DESC LIMIT ?''',
+                          (repo_name, f'%{search_query}%', f'%{search_query}%', limit))
+        else:
             c.execute(f'''{query_base} 
-                         WHERE repo_name=? AND (summary LIKE ? OR tags LIKE ?)
+                         WHERE repo_name=? 
                          ORDER BY (entry_type = 'agent_session') DESC, timestamp DESC LIMIT ?''',
-                      (repo_name, f'%{search_query}%', f'%{search_query}%', limit))
-    else:
-        c.execute(f'''{query_base} 
-                     WHERE repo_name=? 
-                     ORDER BY (entry_type = 'agent_session') DESC, timestamp DESC LIMIT ?''',
-                  (repo_name, limit))
+                      (repo_name, limit))
     
-    rows = c.fetchall()
-    conn.close()
+        rows = c.fetchall()
     
     if not rows:
         return [{"status": "no_history", "message": "<!-- No relevant historical reviews found -->"}]
@@ -186,13 +225,11 @@ def get_analysis_with_config(entry_id: int) -> Optional[Dict[str, Any]]:
     if not os.path.exists(DB_PATH):
         return None
         
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute('''SELECT id, timestamp, diff_hash, prompt_hash, model, response, 
+    with _lock:
+        c = get_db_connection().execute('''SELECT id, timestamp, diff_hash, prompt_hash, model, response, 
                         repo_name, summary, tags, entry_type, config_snapshot 
                  FROM analysis_history WHERE id=?''', (entry_id,))
-    row = c.fetchone()
-    conn.close()
+        row = c.fetchone()
     
     if not row:
         return None
@@ -228,39 +265,93 @@ def save_cache(diff_hash: str, prompt_hash: str, model: str, response: str,
         entry_type: 'review' or 'agent_session'
         config_snapshot: JSON string of WorkflowConfig for reproducibility
     """
-    init_db() # Ensure DB exists
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute('''INSERT INTO analysis_history 
-                 (diff_hash, prompt_hash, model, response, cost, repo_name, summary, tags, entry_type, config_snapshot) 
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-              (diff_hash, prompt_hash, model, response, cost, repo_name, summary, tags, entry_type, config_snapshot))
-    conn.commit()
-    conn.close()
+    _insert_rows([(diff_hash, prompt_hash, model, response, cost, repo_name, summary, tags, entry_type, config_snapshot)])
     print(f"[DB] Saved {entry_type} entry for {diff_hash[:8]} (Repo: {repo_name}, Tags: {tags})")
 
+def save_cache_many(rows: List[Dict[str, Any]]) -> int:
+    """Save several analysis results in a single transaction.
+
+    Args:
+        rows: Dicts of save_cache keyword arguments (diff_hash, prompt_hash,
+            model and response are required).
+
+    Returns:
+        Number of rows inserted.
+    """
+    params = [_history_row(**row) for row in rows]
+    if params:
+        _insert_rows(params)
+        print(f"[DB] Saved {len(params)} entries")
+    return len(params)
+
+def _history_row(diff_hash, prompt_hash, model, response, cost=0.0, repo_name=None,
+                 summary=None, tags=None, entry_type='review', config_snapshot=None):
+    """Order save_cache arguments as the columns of _INSERT_SQL."""
+    return (diff_hash, prompt_hash, model, response, cost, repo_name, summary, tags, entry_type, config_snapshot)
+
+def _insert_rows(params):
+    """Insert analysis_history rows and commit once."""
+    init_db() # Ensure DB exists
+    with _lock:
+        conn = get_db_connection()
+        with conn:
+            conn.executemany(_INSERT_SQL, params)
+
+def save_cache_async(**kwargs):
+    """Queue a save_cache call for the background writer and return immediately.
+
+    Takes save_cache's keyword arguments. Queued writes are flushed at exit;
+    call flush_writes() to wait for them sooner.
+    """
+    save_cache_many_async([kwargs])
+
+def save_cache_many_async(rows: List[Dict[str, Any]]):
+    """Queue a save_cache_many call for the background writer and return immediately."""
+    global _writer
+    with _lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_drain_writes, name="db-writer", daemon=True)
+            _writer.start()
+    _write_queue.put(list(rows))
+
+def flush_writes():
+    """Block until every queued async write has been committed."""
+    _write_queue.join()
+
+def _drain_writes():
+    """Writer thread loop: commit each queued batch in one transaction."""
+    while True:
+        rows = _write_queue.get()
+        try:
+            save_cache_many(rows)
+        except Exception as e:
+            print(f"[DB] [WARN] Background save failed: {e}")
+        finally:
+            _write_queue.task_done()
+
+atexit.register(flush_writes)
+
 def update_tags(entry_id: int, add_tags: str = None, remove_tags: str = None):
     """Manually update tags for a specific entry."""
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute("SELECT tags FROM analysis_history WHERE id=?", (entry_id,))
-    row = c.fetchone()
-    if not row:
-        print(f"[ERROR] Entry ID {entry_id} not found.")
-        conn.close()
-        return False
-        
-    current_tags = set(row['tags'].split(',') if row['tags'] else [])
-    if add_tags:
-        current_tags.update([t.strip() for t in add_tags.split(',')])
-    if remove_tags:
-        for t in remove_tags.split(','):
-            current_tags.discard(t.strip())
+    with _lock:
+        conn = get_db_connection()
+        c = conn.cursor()
+        c.execute("SELECT tags FROM analysis_history WHERE id=?", (entry_id,))
+        row = c.fetchone()
+        if not row:
+            print(f"[ERROR] Entry ID {entry_id} not found.")
+            return False
             
-    new_tags_str = ','.join(sorted(filter(None, current_tags)))
-    c.execute("UPDATE analysis_history SET tags=? WHERE id=?", (new_tags_str, entry_id))
-    conn.commit()
-    conn.close()
+        current_tags = set(row['tags'].split(',') if row['tags'] else [])
+        if add_tags:
+            current_tags.update([t.strip() for t in add_tags.split(',')])
+        if remove_tags:
+            for t in remove_tags.split(','):
+                current_tags.discard(t.strip())
+                
+        new_tags_str = ','.join(sorted(filter(None, current_tags)))
+        c.execute("UPDATE analysis_history SET tags=? WHERE id=?", (new_tags_str, entry_id))
+        conn.commit()
     print(f"[DB] Updated tags for ID {entry_id}: {new_tags_str}")
     return True
 
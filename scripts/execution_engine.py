@@ -169,7 +169,9 @@ def save_execution_results(
     full_prompt: str,
     base_prompt: str,
     response: str,
-    output_dir: Path
+    output_dir: Path,
+    diff_hash: Optional[str] = None,
+    prompt_hash: Optional[str] = None
 ) -> None:
     """Save workflow execution results to disk and database.
 
@@ -180,6 +182,8 @@ def save_execution_results(
         base_prompt: Rendered prompt without context (for hashing)
         response: LLM response
         output_dir: Directory to save artifacts
+        diff_hash: Precomputed cache hash of diff_content (computed if omitted)
+        prompt_hash: Precomputed cache hash of base_prompt (computed if omitted)
 
     Raises:
         ExecutionError: If saving fails
@@ -203,8 +207,10 @@ def save_execution_results(
             try:
                 from scripts import db_manager
 
-                diff_hash = hashlib.sha256(diff_content.encode()).hexdigest()
-                prompt_hash = hashlib.sha256(base_prompt.encode()).hexdigest()
+                if diff_hash is None:
+                    diff_hash = hashlib.sha256(diff_content.encode()).hexdigest()
+                if prompt_hash is None:
+                    prompt_hash = hashlib.sha256(base_prompt.encode()).hexdigest()
                 model = wf_config.get('model', 'unknown')
                 repo_name = wf_config.get('repo_name', 'unknown')
 
@@ -315,7 +321,9 @@ def execute_workflow_step(
         full_prompt,
         base_prompt,
         response,
-        output_dir
+        output_dir,
+        diff_hash=diff_hash,
+        prompt_hash=prompt_hash
     )
 
     return {
@@ -5,7 +5,7 @@ new providers without modifying the orchestrator.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 import os
 import logging
 
@@ -15,6 +15,9 @@ logger = logging.getLogger(__name__)
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
+    #: True when stream() yields text incrementally rather than all at once
+    supports_streaming = False
+    
     @abstractmethod
     def call(self, prompt: str, **kwargs) -> str:
         """Call the LLM with a prompt.
@@ -31,6 +34,21 @@ class LLMProvider(ABC):
         """
         pass
     
+    def stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Call the LLM and yield the response text in chunks.
+        
+        Providers without a streaming API yield the whole response from
+        call() as a single chunk.
+        
+        Args:
+            prompt: The prompt to send to the LLM
+            **kwargs: Provider-specific parameters
+            
+        Yields:
+            Pieces of the response text, in order
+        """
+        yield self.call(prompt, **kwargs)
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Check if this provider is available/configured.
@@ -62,6 +80,8 @@ class LLMProvider(ABC):
 class GeminiProvider(LLMProvider):
     """Google Gemini API provider."""
     
+    supports_streaming = True
+    
     def call(self, prompt: str, model: Optional[str] = None, **kwargs) -> str:
         """Call Gemini API with retry logic.
         
@@ -78,6 +98,22 @@ class GeminiProvider(LLMProvider):
         model = model or self.get_default_model()
         return call_gemini.call_with_retry(prompt, model=model)
     
+    def stream(self, prompt: str, model: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Stream a Gemini API response as it is generated.
+        
+        Args:
+            prompt: The prompt to send
+            model: Model to use (default: gemini-2.0-flash-exp)
+            **kwargs: Additional parameters
+            
+        Yields:
+            Chunks of Gemini's response text
+        """
+        from scripts import call_gemini
+        
+        model = model or self.get_default_model()
+        yield from call_gemini.stream_with_retry(prompt, model=model)
+    
     def is_available(self) -> bool:
         """Check if Gemini API key is configured."""
         return bool(os.getenv("GEMINI_API_KEY"))
@@ -106,6 +142,8 @@ class GeminiProvider(LLMProvider):
 class GeminiCLIProvider(LLMProvider):
     """Google Gemini CLI provider."""
     
+    supports_streaming = True
+    
     def call(
         self,
         prompt: str,
@@ -140,6 +178,34 @@ class GeminiCLIProvider(LLMProvider):
             timeout=timeout
         )
     
+    def stream(
+        self,
+        prompt: str,
+        allow_tools: Optional[list[str]] = None,
+        deny_tools: Optional[list[str]] = None,
+        allow_all_tools: bool = False,
+        timeout: int = 300,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream Gemini CLI's output as it is printed.
+        
+        Args:
+            Same as call()
+            
+        Yields:
+            Lines of Gemini CLI's response text
+        """
+        from scripts import call_gemini_cli
+        
+        yield from call_gemini_cli.stream_gemini_cli(
+            prompt=prompt,
+            model=kwargs.get('model'),
+            allow_tools=allow_tools,
+            deny_tools=deny_tools,
+            allow_all_tools=allow_all_tools,
+            timeout=timeout
+        )
+    
     def is_available(self) -> bool:
         """Check if Gemini CLI is installed and authenticated."""
         from scripts import call_gemini_cli
@@ -163,6 +229,8 @@ class GeminiCLIProvider(LLMProvider):
 class CopilotCLIProvider(LLMProvider):
     """GitHub Copilot CLI provider."""
     
+    supports_streaming = True
+    
     def call(
         self,
         prompt: str,
@@ -195,6 +263,33 @@ class CopilotCLIProvider(LLMProvider):
             timeout=timeout
         )
     
+    def stream(
+        self,
+        prompt: str,
+        allow_tools: Optional[list[str]] = None,
+        deny_tools: Optional[list[str]] = None,
+        allow_all_tools: bool = False,
+        timeout: int = 300,
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream GitHub Copilot CLI's output as it is printed.
+        
+        Args:
+            Same as call()
+            
+        Yields:
+            Lines of Copilot's response text
+        """
+        from scripts import call_copilot_cli
+        
+        yield from call_copilot_cli.call_copilot_stream(
+            prompt=prompt,
+            allow_tools=allow_tools,
+            deny_tools=deny_tools,
+            allow_all_tools=allow_all_tools,
+            timeout=timeout
+        )
+    
     def is_available(self) -> bool:
         """Check if Copilot CLI is installed and authenticated."""
         from scripts import call_copilot_cli
@@ -4,6 +4,7 @@ import sys
 import os
 import re
 import json
+import functools
 from jinja2 import Environment, meta, FileSystemLoader, StrictUndefined
 
 def detect_languages(diff_text):
@@ -26,6 +27,31 @@ def detect_languages(diff_text):
     
     return list(languages) if languages else ['unknown']
 
+# Paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPT_DIR)
+PROMPTS_DIR = os.path.join(REPO_ROOT, 'prompts')
+
+# Rendered in place of a run's output folder so the prompt (and its cache hash)
+# is the same on every run; git text never contains NUL, so it cannot clash
+OUTPUT_DIR_PLACEHOLDER = "\0OUTPUT_DIR\0"
+
+@functools.lru_cache(maxsize=8)
+def _get_env(cwd):
+    """Shared Jinja2 environment (per working directory, which is on the search path).
+
+    Reusing it keeps Jinja's compiled-template cache for included macros;
+    auto_reload still picks up edited files.
+    """
+    return Environment(loader=FileSystemLoader([PROMPTS_DIR, REPO_ROOT, cwd]),
+                       undefined=StrictUndefined, cache_size=400)
+
+@functools.lru_cache(maxsize=128)
+def _compile_template(env, template_path, mtime_ns):
+    """Compile a template file once per modification time."""
+    with open(template_path, 'r', encoding='utf-8') as f:
+        return env.from_string(f.read())
+
 def render_template(template_path, diff_content, repo_name="unknown", context_data=None, 
                     signals_data=None, docs_data=None, findings_data=None, env_vars=None, 
                     inject_diff_content=True, commit_history_data=None, target_ref=None, 
@@ -33,13 +59,7 @@ def render_template(template_path, diff_content, repo_name="unknown", context_da
     if env_vars is None:
         env_vars = os.environ
 
-    # Paths
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    repo_root = os.path.dirname(script_dir)
-    prompts_dir = os.path.join(repo_root, 'prompts')
-
-    # Init Jinja2 with loader
-    env = Environment(loader=FileSystemLoader([prompts_dir, repo_root, os.getcwd()]), undefined=StrictUndefined)
+    env = _get_env(os.getcwd())
 
     # Config extraction
     code_lang_config = env_vars.get('CODE_LANGUAGE', 'auto')
@@ -69,21 +89,24 @@ def render_template(template_path, diff_content, repo_name="unknown", context_da
     provided.update(kwargs)
 
     # Load Template
-    if os.path.exists(template_path):
-        try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template_src = f.read()
-            template = env.from_string(template_src)
-        except Exception as e:
-            raise RuntimeError(f"Failed to read template: {e}")
-    else:
+    try:
+        mtime_ns = os.stat(template_path).st_mtime_ns
+    except OSError:
         raise FileNotFoundError(f"Template file not found: {template_path}")
+    try:
+        template = _compile_template(env, os.path.abspath(template_path), mtime_ns)
+    except Exception as e:
+        raise RuntimeError(f"Failed to read template: {e}")
 
     try:
         return template.render(**provided)
     except Exception as e:
         raise RuntimeError(f"Render failed: {e}")
 
+def bind_output_dir(prompt, output_dir):
+    """Fill in the run folder of a prompt rendered with OUTPUT_DIR=OUTPUT_DIR_PLACEHOLDER."""
+    return prompt.replace(OUTPUT_DIR_PLACEHOLDER, output_dir)
+
 def main():
     if len(sys.argv) < 3:
         print("Usage: render_prompt.py <template_file> <diff_file> [repo_name] [context_file] [signals_file] [docs_file] [findings_file]")
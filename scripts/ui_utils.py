@@ -1,23 +1,48 @@
 import os
 import subprocess
-import glob
 import sys
 import json
+import functools
+import gzip
 
-# Add scripts to path for internal modules
+# Add scripts to path for internal modules (imported lazily by the helpers
+# that need them, so list_repositories() stays cheap for the CLI)
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-import db_manager
-import checker_engine
+
+# Compressed patches for commit-to-commit diffs, keyed by resolved SHAs
+DIFF_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "diff_cache")
+# Least recently used patches are evicted beyond either cap
+DIFF_CACHE_MAX_FILES = 200
+DIFF_CACHE_MAX_BYTES = 100 * 1024 * 1024
 
 def list_repositories():
     """List all configured repositories in repository-setup/."""
-    repos = []
-    files = glob.glob("repository-setup/*.md")
-    for f in files:
-        name = os.path.basename(f).replace(".md", "")
-        if name.upper() not in ["README", "TEMPLATE"]:
-            repos.append(name)
-    return sorted(repos)
+    try:
+        with os.scandir("repository-setup") as entries:
+            # DirEntry.is_file() reuses the type from the directory listing
+            return sorted(
+                e.name[:-3] for e in entries
+                if e.name.endswith(".md") and not e.name.startswith(".")
+                and e.is_file() and e.name[:-3].upper() not in ("README", "TEMPLATE")
+            )
+    except FileNotFoundError:
+        return []
+
+def is_git_repo(repo_path):
+    """Check whether repo_path is inside a git repository.
+
+    A `.git` entry (directory, or file for worktrees/submodules) or a bare
+    repo's HEAD answers without spawning git; anything else falls back to
+    `git rev-parse` so subdirectories of a repo are still accepted.
+    """
+    if os.path.exists(os.path.join(repo_path, ".git")) or os.path.isfile(os.path.join(repo_path, "HEAD")):
+        return True
+    try:
+        subprocess.run(["git", "-C", repo_path, "rev-parse", "--git-dir"],
+                       capture_output=True, text=True, check=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
 
 def get_branches(repo_path):
     """Get all local and remote branches for a repository."""
@@ -34,6 +59,56 @@ def get_branches(repo_path):
     except Exception:
         return ["main"]
 
+def get_refs_state(repo_path):
+    """Return a fingerprint of the repository's branch names, without running git.
+
+    Creating or deleting a branch adds or removes a file under .git/refs/heads
+    or .git/refs/remotes (changing that directory's mtime) or rewrites
+    packed-refs. Repos whose .git is a file (worktrees, submodules) get a
+    constant fingerprint.
+    """
+    git_dir = os.path.join(repo_path, ".git")
+    paths = [os.path.join(git_dir, "packed-refs")]
+    for namespace in ("heads", "remotes"):
+        paths += [root for root, _, _ in os.walk(os.path.join(git_dir, "refs", namespace))]
+
+    state = []
+    for path in paths:
+        try:
+            state.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except OSError:
+            state.append(f"{path}:-")
+    return "\n".join(state)
+
+def get_repo_state(repo_path, refs=(), include_worktree=False):
+    """Return a cheap fingerprint of the repository, for use as a cache key.
+
+    Resolves HEAD plus the given refs in a single `git rev-parse`, so new
+    commits or moved branches change the fingerprint. With include_worktree,
+    also folds in `git status` and the mtime/size of each modified file so
+    uncommitted edits invalidate working-directory diffs too.
+    """
+    cmd = ["git", "-C", repo_path, "rev-parse", "HEAD"] + [r for r in refs if r]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    state = [result.stdout.strip()]
+
+    if include_worktree:
+        status = subprocess.run(
+            ["git", "-C", repo_path, "status", "--porcelain", "-z", "--no-renames", "--untracked-files=no"],
+            capture_output=True, text=True
+        )
+        state.append(status.stdout)
+        for entry in status.stdout.split("\0"):
+            path = entry[3:]
+            if not path:
+                continue
+            try:
+                st = os.stat(os.path.join(repo_path, path))
+                state.append(f"{st.st_mtime_ns}:{st.st_size}")
+            except OSError:
+                state.append("-")
+    return "\n".join(state)
+
 def get_smart_refs(repo_path, target, source, target_commit=None, source_commit=None):
     """
     Intelligently determine refs. 
@@ -60,37 +135,38 @@ def get_smart_refs(repo_path, target, source, target_commit=None, source_commit=
 def get_commits(repo_path, ref, limit=20):
     """Get list of recent commits for a reference with full metadata."""
     try:
-        # Format: hash|date|author|subject
-        # Use a delimiter that is unlikely to appear in the subject, like 0x1f (Unit Separator) but keep it simple with explicit distinct char.
-        # Pipe | might be in commit messages. Let's use a custom delimiter string.
-        delimiter = "|||"
+        # NUL-separated fields and records (-z): hash, date, author, subject.
+        # Subjects can contain any printable text, but never a NUL byte.
         result = subprocess.run(
-            ["git", "-C", repo_path, "log", ref, "-n", str(limit), f"--date=iso", f"--format=%h{delimiter}%ad{delimiter}%an{delimiter}%s"],
+            ["git", "-C", repo_path, "log", ref, "-n", str(limit), "-z", "--date=short", "--format=%h%x00%ad%x00%an%x00%s"],
             capture_output=True, text=True, check=True
         )
-        
+
+        fields = result.stdout.split("\0")
         commits = []
-        for line in result.stdout.splitlines():
-            if not line.strip(): continue
-            parts = line.split(delimiter)
-            if len(parts) >= 4:
-                commits.append({
-                    "hash": parts[0],
-                    "date": parts[1],
-                    "author": parts[2],
-                    "message": parts[3],
-                    "label": f"{parts[0]} - {parts[3]} ({parts[1]})" # Legacy label
-                })
+        for i in range(0, len(fields) - 3, 4):
+            commit_hash, date, author, message = fields[i:i + 4]
+            commits.append({
+                "hash": commit_hash,
+                "date": date,
+                "author": author,
+                "message": message,
+                "label": f"{commit_hash} - {message} ({date})" # Legacy label
+            })
         return commits
     except Exception as e:
         print(f"Error fetching commits: {e}")
         return []
 
 def get_changed_files(repo_path, target, source, target_commit=None, source_commit=None):
-    """Get list of files changed between target and source."""
+    """Get list of files changed between target and source.
+
+    Names only (-z, so unusual paths come back unquoted); rename detection is
+    skipped, so a renamed file shows up as its old and new path.
+    """
     t, s, is_direct = get_smart_refs(repo_path, target, source, target_commit, source_commit)
     
-    cmd = ["git", "-C", repo_path, "diff", "--name-only"]
+    cmd = ["git", "-C", repo_path, "diff", "--name-only", "-z", "--no-renames"]
     if s is None:
         cmd.append(t)
     else:
@@ -102,10 +178,37 @@ def get_changed_files(repo_path, target, source, target_commit=None, source_comm
             cmd,
             capture_output=True, text=True, check=True
         )
-        return [f.strip() for f in result.stdout.splitlines() if f.strip()]
+        return [f for f in result.stdout.split("\0") if f]
     except Exception:
         return []
 
+def get_content_changed_files(repo_path, target, source, target_commit=None, source_commit=None):
+    """Get files whose content really differs, ignoring CR-at-EOL-only changes.
+
+    One `git diff --numstat` replaces reading both versions of every file:
+    rows reporting 0 added / 0 removed lines (line endings, mode changes,
+    empty files) are dropped; binary files ("-\t-") are kept.
+    """
+    t, s, is_direct = get_smart_refs(repo_path, target, source, target_commit, source_commit)
+
+    cmd = ["git", "-C", repo_path, "diff", "--numstat", "-z", "--no-renames", "--ignore-cr-at-eol"]
+    if s is None:
+        cmd.append(t)
+    else:
+        sep = ".." if is_direct else "..."
+        cmd.append(f"{t}{sep}{s}")
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except Exception:
+        return []
+    files = []
+    for record in result.stdout.split("\0"):
+        cols = record.split("\t", 2)
+        if len(cols) == 3 and (cols[0], cols[1]) != ("0", "0"):
+            files.append(cols[2])
+    return files
+
 def get_file_content(repo_path, ref, file_path):
     """Get content of a file at a specific git reference."""
     if ref is None:
@@ -116,40 +219,174 @@ def get_file_content(repo_path, ref, file_path):
         except:
             return ""
             
+    # Git Reference: Read from git
+    return get_blobs(repo_path, [f"{ref}:{file_path}"])[0]
+
+def get_file_versions(repo_path, refs, file_path):
+    """Content of file_path at each ref (None = working directory).
+
+    All git refs are read with a single `git cat-file --batch` call.
+    """
+    blobs = iter(get_blobs(repo_path, [f"{ref}:{file_path}" for ref in refs if ref is not None]))
+    return [get_file_content(repo_path, None, file_path) if ref is None else next(blobs) for ref in refs]
+
+def get_blobs(repo_path, specs):
+    """Read `ref:path` objects with one `git cat-file --batch` process.
+
+    Returns the text of each, in order, with line endings normalized to LF.
+    Objects that don't exist (e.g. a file added or deleted between the refs)
+    and binary blobs (NUL bytes or invalid UTF-8) come back as "".
+    """
+    if not specs:
+        return []
     try:
-        # Git Reference: Read from git
         result = subprocess.run(
-            ["git", "-C", repo_path, "show", f"{ref}:{file_path}"],
-            capture_output=True, text=True, check=True
+            ["git", "-C", repo_path, "cat-file", "--batch"],
+            input="".join(f"{spec}\n" for spec in specs).encode(),
+            capture_output=True, check=True
         )
-        # Normalize line endings to LF to avoid false positives in diff viewers
-        return result.stdout.replace('\r\n', '\n')
     except Exception:
-        # If git show fails, it likely means the file doesn't exist in that ref (New file or Deleted file)
-        return ""
+        return [""] * len(specs)
+
+    # Each reply is "<sha> <type> <size>\n<content>\n", or "<spec> missing\n"
+    out = result.stdout
+    blobs = []
+    pos = 0
+    for _ in specs:
+        eol = out.find(b"\n", pos)
+        header = out[pos:eol].split()
+        pos = eol + 1
+        if len(header) != 3 or not header[2].isdigit():
+            blobs.append("")
+            continue
+        size = int(header[2])
+        content = out[pos:pos + size] if header[1] == b"blob" else b""
+        pos += size + 1
+        try:
+            text = "" if b"\0" in content else content.decode("utf-8")
+        except UnicodeDecodeError:
+            text = ""
+        blobs.append(text.replace('\r\n', '\n'))
+    return blobs
 
 def get_diff(repo_path, target, source, file_path=None, target_commit=None, source_commit=None):
-    """Get raw git diff between target and source for a specific file or whole repo."""
+    """Get raw git diff between target and source for a specific file or whole repo.
+
+    Diffs between two commits are immutable, so once the refs are resolved to
+    SHAs they are served from an in-memory and on-disk cache. Working
+    directory diffs are always computed fresh.
+    """
     t, s, is_direct = get_smart_refs(repo_path, target, source, target_commit, source_commit)
-    
-    cmd = ["git", "-C", repo_path, "diff"]
+    sep = ".." if is_direct else "..."
+
+    try:
+        if s is not None:
+            shas = _resolve_shas(repo_path, t, s)
+            if shas:
+                return _commit_diff(repo_path, shas[0], sep, shas[1], file_path)
+
+        cmd = ["git", "-C", repo_path, "diff", t if s is None else f"{t}{sep}{s}"]
+        if file_path:
+            cmd.append("--")
+            cmd.append(file_path)
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return result.stdout
+    except Exception as e:
+        return f"Error getting diff: {e}"
+
+def _resolve_shas(repo_path, *refs):
+    """Resolve refs to full commit SHAs in one git call, or None if any fails."""
+    result = subprocess.run(
+        ["git", "-C", repo_path, "rev-parse"] + [f"{r}^{{commit}}" for r in refs],
+        capture_output=True, text=True
+    )
+    shas = result.stdout.split()
+    return shas if result.returncode == 0 and len(shas) == len(refs) else None
+
+@functools.lru_cache(maxsize=64)
+def _commit_diff(repo_path, target_sha, sep, source_sha, file_path=None):
+    """Diff two resolved commits, reading/writing the on-disk patch cache.
+
+    Only whole-repo diffs go to disk; per-file diffs are cheap to recompute
+    and one per file selection would flood the cache, so they stay in memory.
+    """
+    cmd = ["git", "-C", repo_path, "diff", f"{target_sha}{sep}{source_sha}"]
+    if file_path:
+        cmd += ["--", file_path]
+        return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+
+    cache_path = os.path.join(DIFF_CACHE_DIR, f"{target_sha}{sep.replace('.', '_')}{source_sha}.patch.gz")
+    try:
+        with gzip.open(cache_path, "rt", encoding="utf-8") as f:
+            diff = f.read()
+        os.utime(cache_path)  # Mark as recently used for eviction
+        return diff
+    except (OSError, EOFError):
+        pass
+
+    diff = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+
+    try:
+        os.makedirs(DIFF_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(gzip.compress(diff.encode("utf-8"), compresslevel=3))
+        os.replace(tmp_path, cache_path)  # Atomic, so readers never see a partial file
+        _prune_diff_cache()
+    except OSError:
+        pass  # The cache is an optimization only
+    return diff
+
+def _prune_diff_cache():
+    """Evict the least recently used patches once the cache exceeds its caps."""
+    entries = []
+    with os.scandir(DIFF_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".patch.gz"):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue  # Evicted by another process meanwhile
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+    entries.sort(reverse=True)  # Most recently used first
+    total = 0
+    for count, (_, size, path) in enumerate(entries, 1):
+        total += size
+        if count > DIFF_CACHE_MAX_FILES or total > DIFF_CACHE_MAX_BYTES:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def get_diff_numstat(repo_path, target, source, target_commit=None, source_commit=None):
+    """Get (lines_added, lines_removed) totals without materializing the patch."""
+    t, s, is_direct = get_smart_refs(repo_path, target, source, target_commit, source_commit)
+
+    cmd = ["git", "-C", repo_path, "diff", "--numstat"]
     if s is None:
         cmd.append(t)
     else:
         sep = ".." if is_direct else "..."
         cmd.append(f"{t}{sep}{s}")
 
-    if file_path:
-        cmd.append("--")
-        cmd.append(file_path)
+    added = removed = 0
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout
-    except Exception as e:
-        return f"Error getting diff: {e}"
+    except Exception:
+        return 0, 0
+    for line in result.stdout.splitlines():
+        cols = line.split("\t", 2)
+        # Binary files report "-\t-"
+        if len(cols) < 3 or cols[0] == "-":
+            continue
+        added += int(cols[0])
+        removed += int(cols[1])
+    return added, removed
 
 def get_findings(repo_path, target, source, target_commit=None, source_commit=None):
     """Extract real findings using the checker engine for the active diff."""
+    import checker_engine
     diff_content = get_diff(repo_path, target, source, target_commit=target_commit, source_commit=source_commit)
     rules = checker_engine.load_rules(repo_path)
     
@@ -168,11 +405,13 @@ def get_findings(repo_path, target, source, target_commit=None, source_commit=No
 
 def get_history(repo_name=None, limit=5, search_query=None):
     """Retrieve filtered history entries via db_manager."""
+    import db_manager
     db_manager.init_db()
     return db_manager.get_context(repo_name, limit, search_query)
 
 def get_session_details(session_id):
     """Retrieve full analysis details for a session replay."""
+    import db_manager
     db_manager.init_db()
     conn = db_manager.sqlite3.connect(db_manager.DB_PATH)
     conn.row_factory = db_manager.sqlite3.Row
@@ -189,11 +428,11 @@ def list_prompt_library():
     library = []
     prompts_dir = "prompts"
     
-    # Lazy import yaml to avoid startup cost if not needed immediately
+    # Lazy import: config_utils pulls in yaml (with the libyaml loader when available)
     try:
-        import yaml
+        import config_utils
     except ImportError:
-        yaml = None
+        config_utils = None
 
     for root, dirs, files in os.walk(prompts_dir):
         for file in files:
@@ -204,19 +443,15 @@ def list_prompt_library():
                 # Parse Frontmatter
                 description = None
                 tags = []
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if content.startswith("---\n"):
-                            # Extract frontmatter block
-                            parts = content.split("---\n", 2)
-                            if len(parts) >= 3 and yaml:
-                                meta = yaml.safe_load(parts[1])
-                                if isinstance(meta, dict):
-                                    description = meta.get('description')
-                                    tags = meta.get('tags', [])
-                except Exception:
-                    pass
+                if config_utils:
+                    try:
+                        with open(full_path, 'r', encoding='utf-8') as f:
+                            meta, _ = config_utils.split_front_matter(f.read())
+                        if isinstance(meta, dict):
+                            description = meta.get('description')
+                            tags = meta.get('tags', [])
+                    except Exception:
+                        pass
 
                 library.append({
                     "name": rel_path,
@@ -1,5 +1,6 @@
 import pytest
 import subprocess
+import sys
 from pathlib import Path
 
 @pytest.fixture
@@ -20,3 +21,16 @@ def mock_git_repo(tmp_path):
     subprocess.run(["git", "branch", "-m", "main"], cwd=repo_dir, check=True) # Ensure main branch
     
     return repo_dir
+
+@pytest.fixture(autouse=True)
+def fresh_gemini_client():
+    """Drop pooled Gemini clients so tests that patch genai.Client get a new one."""
+    def clear():
+        # Tests import the module both as scripts.call_gemini and as call_gemini
+        for name in ("scripts.call_gemini", "call_gemini"):
+            module = sys.modules.get(name)
+            if module is not None:
+                module._client_for_key.cache_clear()
+    clear()
+    yield
+    clear()
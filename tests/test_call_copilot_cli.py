@@ -0,0 +1,195 @@
+"""Tests for the GitHub Copilot CLI integration module."""
+
+import os
+import stat
+import subprocess
+from unittest.mock import patch, MagicMock
+
+import pytest
+from scripts import call_copilot_cli, cli_utils
+
+
+@pytest.fixture(autouse=True)
+def clear_probe_caches(tmp_path, monkeypatch):
+    """Reset the memoized install/auth probes around each test.
+
+    Also hides any real Copilot credentials so the live probe paths run.
+    """
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+    for var in call_copilot_cli.COPILOT_TOKEN_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    call_copilot_cli.is_copilot_installed.cache_clear()
+    call_copilot_cli.check_authentication.cache_clear()
+    yield
+    call_copilot_cli.is_copilot_installed.cache_clear()
+    call_copilot_cli.check_authentication.cache_clear()
+
+
+class TestInstallProbe:
+    """Test is_copilot_installed()."""
+
+    @patch('scripts.call_copilot_cli.subprocess.run')
+    def test_probe_is_memoized(self, mock_run):
+        """Repeated calls spawn the version probe only once."""
+        mock_run.return_value = MagicMock(returncode=0)
+
+        assert call_copilot_cli.is_copilot_installed() is True
+        assert call_copilot_cli.is_copilot_installed() is True
+        assert mock_run.call_count == 1
+
+    @patch('scripts.call_copilot_cli.subprocess.run', side_effect=FileNotFoundError)
+    def test_not_installed(self, mock_run):
+        """Missing executable reports False."""
+        assert call_copilot_cli.is_copilot_installed() is False
+
+    @patch('scripts.call_copilot_cli.subprocess.run')
+    def test_failure_is_reprobed_after_retry_window(self, mock_run, monkeypatch):
+        """A negative result expires, so installing the CLI later is noticed."""
+        mock_run.side_effect = [FileNotFoundError, MagicMock(returncode=0)]
+        clock = [1000.0]
+        monkeypatch.setattr(cli_utils.time, "monotonic", lambda: clock[0])
+
+        assert call_copilot_cli.is_copilot_installed() is False
+        assert call_copilot_cli.is_copilot_installed() is False
+        assert mock_run.call_count == 1
+
+        clock[0] += cli_utils.PROBE_RETRY_SECONDS
+        assert call_copilot_cli.is_copilot_installed() is True
+        assert mock_run.call_count == 2
+
+
+class TestAuthProbe:
+    """Test check_authentication()."""
+
+    @patch('scripts.call_copilot_cli.subprocess.run')
+    def test_probe_is_memoized(self, mock_run):
+        """Repeated calls reuse the cached authentication result."""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+
+        assert call_copilot_cli.check_authentication() is True
+        assert call_copilot_cli.check_authentication() is True
+        # One install probe plus one auth probe
+        assert mock_run.call_count == 2
+
+    @patch('scripts.call_copilot_cli.subprocess.run')
+    def test_auth_failure(self, mock_run):
+        """An authentication complaint on stderr reports False."""
+        mock_run.side_effect = [
+            MagicMock(returncode=0, stderr=""),
+            MagicMock(returncode=1, stderr="Please authenticate first"),
+        ]
+
+        assert call_copilot_cli.check_authentication() is False
+
+    @patch('scripts.call_copilot_cli.subprocess.run',
+           side_effect=subprocess.TimeoutExpired(cmd='copilot', timeout=10))
+    def test_timeout(self, mock_run):
+        """A hanging CLI is treated as unavailable."""
+        assert call_copilot_cli.check_authentication() is False
+
+    @patch('scripts.call_copilot_cli.subprocess.run')
+    def test_token_env_skips_probe(self, mock_run, monkeypatch):
+        """A Copilot token in the environment is trusted without sending a prompt."""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        monkeypatch.setenv("COPILOT_GITHUB_TOKEN", "ghp_test")
+
+        assert call_copilot_cli.check_authentication() is True
+        # Only the install probe ran
+        assert mock_run.call_count == 1
+
+    @patch('scripts.call_copilot_cli.subprocess.run')
+    def test_generic_github_token_still_probes(self, mock_run, monkeypatch):
+        """GH_TOKEN alone does not prove Copilot access; the live probe decides."""
+        mock_run.side_effect = [
+            MagicMock(returncode=0, stderr=""),
+            MagicMock(returncode=1, stderr="Please authenticate first"),
+        ]
+        monkeypatch.setenv("GH_TOKEN", "ghp_test")
+
+        assert call_copilot_cli.check_authentication() is False
+        assert mock_run.call_count == 2
+
+    @patch('scripts.call_copilot_cli.subprocess.run')
+    def test_logged_in_config_skips_probe(self, mock_run, tmp_path):
+        """A logged-in user in ~/.copilot/config.json is trusted without sending a prompt."""
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        (tmp_path / ".copilot").mkdir()
+        (tmp_path / ".copilot" / "config.json").write_text(
+            '{"logged_in_users": [{"host": "https://github.com", "login": "octocat"}]}'
+        )
+
+        assert call_copilot_cli.check_authentication() is True
+        assert mock_run.call_count == 1
+
+    @patch('scripts.call_copilot_cli.subprocess.run')
+    def test_config_without_login_falls_back_to_probe(self, mock_run, tmp_path):
+        """A config file with no logged-in user still gets the live probe."""
+        mock_run.side_effect = [
+            MagicMock(returncode=0, stderr=""),
+            MagicMock(returncode=1, stderr="Please authenticate first"),
+        ]
+        (tmp_path / ".copilot").mkdir()
+        (tmp_path / ".copilot" / "config.json").write_text('{"trusted_folders": []}')
+
+        assert call_copilot_cli.check_authentication() is False
+        assert mock_run.call_count == 2
+
+
+def install_fake_copilot(directory, body, monkeypatch):
+    """Put a fake `copilot` executable first on PATH; it answers --version itself."""
+    script = directory / "copilot"
+    script.write_text(
+        "#!/bin/sh\n"
+        'if [ "$1" = "--version" ]; then echo 0.0.0; exit 0; fi\n'
+        + body
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{directory}{os.pathsep}{os.environ['PATH']}")
+
+
+class TestCallCopilotStream:
+    """Test call_copilot_stream()."""
+
+    def test_yields_lines_as_printed(self, tmp_path, monkeypatch):
+        """The prompt goes in on stdin and output lines come back one by one."""
+        install_fake_copilot(tmp_path, 'echo "review of:"\ncat\n', monkeypatch)
+
+        chunks = list(call_copilot_cli.call_copilot_stream("line 1\nline 2\n"))
+
+        assert chunks == ["review of:\n", "line 1\n", "line 2\n"]
+
+    def test_auth_error_with_zero_exit(self, tmp_path, monkeypatch):
+        """An auth complaint on stderr raises even when the CLI exits 0."""
+        install_fake_copilot(tmp_path, 'echo "No authentication information found" >&2\n', monkeypatch)
+
+        with pytest.raises(call_copilot_cli.CopilotAuthError):
+            list(call_copilot_cli.call_copilot_stream("Review this"))
+
+    def test_failure_raises(self, tmp_path, monkeypatch):
+        """A non-zero exit raises CopilotError with stderr attached."""
+        install_fake_copilot(tmp_path, 'echo "boom" >&2\nexit 2\n', monkeypatch)
+
+        with pytest.raises(call_copilot_cli.CopilotError, match="exit code 2"):
+            list(call_copilot_cli.call_copilot_stream("Review this"))
+
+
+class TestCallCopilot:
+    """Test call_copilot(), which joins call_copilot_stream()."""
+
+    def test_returns_stripped_output(self, tmp_path, monkeypatch):
+        install_fake_copilot(tmp_path, 'echo\necho "looks good"\necho\n', monkeypatch)
+
+        assert call_copilot_cli.call_copilot("Review this") == "looks good"
+
+    def test_failure_reports_stdout_and_stderr(self, tmp_path, monkeypatch):
+        install_fake_copilot(tmp_path, 'echo "partial"\necho "boom" >&2\nexit 2\n', monkeypatch)
+
+        with pytest.raises(call_copilot_cli.CopilotError, match="(?s)STDERR: boom.*STDOUT: partial"):
+            call_copilot_cli.call_copilot("Review this")
+
+    def test_unauthorized_exit_is_auth_error(self, tmp_path, monkeypatch):
+        install_fake_copilot(tmp_path, 'echo "401 Unauthorized" >&2\nexit 1\n', monkeypatch)
+
+        with pytest.raises(call_copilot_cli.CopilotAuthError):
+            call_copilot_cli.call_copilot("Review this")
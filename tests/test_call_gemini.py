@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from google.api_core import exceptions
-from scripts.call_gemini import call_with_retry, count_tokens, get_client
+from scripts.call_gemini import call_with_retry, count_tokens, get_client, stream_with_retry
 
 class TestCallGemini:
     @pytest.fixture
@@ -22,6 +22,12 @@ class TestCallGemini:
                 get_client()
                 mock_client_cls.assert_called_with(api_key='fake_key')
 
+    def test_get_client_is_reused(self):
+        with patch.dict('os.environ', {'GEMINI_API_KEY': 'reused_key'}):
+            with patch('google.genai.Client') as mock_client_cls:
+                assert get_client() is get_client()
+                assert mock_client_cls.call_count == 1
+
     def test_count_tokens(self, mock_client):
         tokens = count_tokens("test prompt", client=mock_client)
         assert tokens == 100
@@ -69,3 +75,31 @@ class TestCallGemini:
             call_with_retry("test", client=mock_client)
         
         assert mock_client.models.generate_content.call_count == 3 # MAX_RETRIES is 3
+
+    def test_stream_with_retry_yields_chunks(self, mock_client):
+        mock_client.models.generate_content_stream.return_value = iter([
+            MagicMock(text="Hello "), MagicMock(text=None), MagicMock(text="world")
+        ])
+        assert list(stream_with_retry("test", client=mock_client)) == ["Hello ", "world"]
+
+    @patch('time.sleep')
+    def test_stream_with_retry_retries_before_first_chunk(self, mock_sleep, mock_client):
+        mock_client.models.generate_content_stream.side_effect = [
+            exceptions.ServiceUnavailable("Service down"),
+            iter([MagicMock(text="Recovered")])
+        ]
+        assert "".join(stream_with_retry("test", client=mock_client)) == "Recovered"
+        assert mock_sleep.call_count == 1
+
+    def test_stream_with_retry_no_retry_after_partial_output(self, mock_client):
+        def partial(**kwargs):
+            yield MagicMock(text="partial")
+            raise exceptions.ServiceUnavailable("Dropped")
+        mock_client.models.generate_content_stream.side_effect = partial
+
+        chunks = []
+        with pytest.raises(RuntimeError, match="Max retries"):
+            for chunk in stream_with_retry("test", client=mock_client):
+                chunks.append(chunk)
+        assert chunks == ["partial"]
+        assert mock_client.models.generate_content_stream.call_count == 1
@@ -0,0 +1,103 @@
+import os
+import stat
+from unittest.mock import patch, MagicMock
+
+import pytest
+from scripts import call_gemini_cli, cli_utils
+from scripts.call_gemini_cli import GeminiCLIAuthError, GeminiCLIError, stream_gemini_cli
+
+
+@pytest.fixture(autouse=True)
+def clear_probe_cache():
+    """Reset the memoized executable lookup and install probe around each test."""
+    call_gemini_cli._invalidate_cli_cache()
+    yield
+    call_gemini_cli._invalidate_cli_cache()
+
+
+def install_fake_gemini(directory, body, monkeypatch):
+    """Put a fake `gemini` executable first on PATH; it answers --version itself."""
+    script = directory / "gemini"
+    script.write_text(
+        "#!/bin/sh\n"
+        'if [ "$1" = "--version" ]; then echo 0.0.0; exit 0; fi\n'
+        + body
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{directory}{os.pathsep}{os.environ['PATH']}")
+
+
+class TestStreamGeminiCLI:
+    def test_yields_lines_as_printed(self, tmp_path, monkeypatch):
+        install_fake_gemini(tmp_path, 'echo "line one"\necho "line two"\n', monkeypatch)
+
+        assert list(stream_gemini_cli("Review this")) == ["line one\n", "line two\n"]
+
+    def test_long_prompt_goes_to_stdin(self, tmp_path, monkeypatch):
+        install_fake_gemini(tmp_path, "wc -c\n", monkeypatch)
+        prompt = "x" * 200_000
+
+        assert int("".join(stream_gemini_cli(prompt)).strip()) == len(prompt)
+
+    def test_short_prompt_not_in_argv(self, tmp_path, monkeypatch):
+        install_fake_gemini(tmp_path, 'for arg in "$@"; do echo "arg: $arg"; done\ncat\n', monkeypatch)
+
+        output = "".join(stream_gemini_cli("secret prompt"))
+
+        assert "arg: secret prompt" not in output
+        assert output.endswith("secret prompt")
+
+    def test_auth_failure_raises(self, tmp_path, monkeypatch):
+        install_fake_gemini(tmp_path, 'echo "Please login first" >&2\nexit 1\n', monkeypatch)
+
+        with pytest.raises(GeminiCLIAuthError, match="Please login first"):
+            list(stream_gemini_cli("Review this"))
+
+    def test_timeout_kills_cli(self, tmp_path, monkeypatch):
+        install_fake_gemini(tmp_path, 'echo "started"\nexec sleep 10\n', monkeypatch)
+
+        with pytest.raises(GeminiCLIError, match="timed out after 1 seconds"):
+            list(stream_gemini_cli("Review this", timeout=1))
+
+
+class TestProbes:
+    @patch('scripts.call_gemini_cli.shutil.which', return_value='/usr/bin/gemini')
+    @patch('scripts.call_gemini_cli.subprocess.run')
+    def test_auth_reuses_install_probe(self, mock_run, mock_which):
+        """Installed and authenticated checks share one `gemini --version` run."""
+        mock_run.return_value = MagicMock(returncode=0)
+
+        assert call_gemini_cli.is_gemini_cli_installed() is True
+        assert call_gemini_cli.is_gemini_cli_authenticated() is True
+        assert call_gemini_cli._gemini_path() == '/usr/bin/gemini'
+        assert mock_run.call_count == 1
+        assert mock_which.call_count == 1
+
+    @patch('scripts.call_gemini_cli.shutil.which', return_value='/usr/bin/gemini')
+    @patch('scripts.call_gemini_cli.subprocess.run')
+    def test_failed_install_probe_expires(self, mock_run, mock_which, monkeypatch):
+        """A failed probe is retried after the retry window, so a later install is noticed."""
+        mock_run.side_effect = [MagicMock(returncode=1), MagicMock(returncode=0)]
+        clock = [1000.0]
+        monkeypatch.setattr(cli_utils.time, "monotonic", lambda: clock[0])
+
+        assert call_gemini_cli.is_gemini_cli_installed() is False
+        assert call_gemini_cli.is_gemini_cli_installed() is False
+        assert mock_run.call_count == 1
+
+        clock[0] += cli_utils.PROBE_RETRY_SECONDS
+        assert call_gemini_cli.is_gemini_cli_installed() is True
+        assert mock_run.call_count == 2
+
+    @patch('scripts.call_gemini_cli.shutil.which', side_effect=[None, '/usr/bin/gemini'])
+    def test_missing_path_is_searched_again(self, mock_which, monkeypatch):
+        """A PATH miss is not cached for good; a found path is."""
+        clock = [1000.0]
+        monkeypatch.setattr(cli_utils.time, "monotonic", lambda: clock[0])
+
+        assert call_gemini_cli._gemini_path() is None
+        assert call_gemini_cli._gemini_path() is None
+        clock[0] += cli_utils.PROBE_RETRY_SECONDS
+        assert call_gemini_cli._gemini_path() == '/usr/bin/gemini'
+        assert call_gemini_cli._gemini_path() == '/usr/bin/gemini'
+        assert mock_which.call_count == 2
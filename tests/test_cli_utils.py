@@ -0,0 +1,44 @@
+"""Tests for the subprocess helpers shared by the CLI integrations."""
+
+import subprocess
+import time
+
+import pytest
+from scripts.cli_utils import stream_process
+
+
+def run(cmd, prompt="", timeout=5):
+    """Drain stream_process, returning (lines, returncode, stderr)."""
+    lines = []
+    gen = stream_process(cmd, prompt, timeout)
+    while True:
+        try:
+            lines.append(next(gen))
+        except StopIteration as stop:
+            return (lines, *stop.value)
+
+
+class TestStreamProcess:
+    def test_yields_stdout_and_returns_status(self):
+        lines, returncode, stderr = run(["sh", "-c", 'cat; echo; echo "oops" >&2; exit 3'], "hello")
+        assert lines == ["hello\n"]
+        assert returncode == 3
+        assert stderr == "oops\n"
+
+    def test_timeout_kills_command(self):
+        start = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired):
+            run(["sh", "-c", "echo started; exec sleep 10"], timeout=1)
+        assert time.monotonic() - start < 5
+
+    def test_consumer_stopping_early_kills_command(self, tmp_path):
+        marker = tmp_path / "finished"
+        gen = stream_process(["sh", "-c", f"echo first; sleep 2; touch {marker}"], "", 10)
+        assert next(gen) == "first\n"
+        gen.close()
+        time.sleep(2.5)
+        assert not marker.exists()
+
+    def test_missing_executable(self):
+        with pytest.raises(FileNotFoundError):
+            run(["definitely-not-a-real-command"])
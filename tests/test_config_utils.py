@@ -0,0 +1,83 @@
+"""Tests for repository config loading."""
+
+import os
+import pytest
+from scripts import config_utils
+
+
+@pytest.fixture
+def setup_dir(tmp_path, monkeypatch):
+    """Run from a temp dir containing an empty repository-setup/."""
+    (tmp_path / "repository-setup").mkdir()
+    monkeypatch.chdir(tmp_path)
+    config_utils._parse_config_file.cache_clear()
+    yield tmp_path / "repository-setup"
+    config_utils._parse_config_file.cache_clear()
+
+
+def write_config(setup_dir, name, body):
+    path = setup_dir / f"{name}.md"
+    path.write_text(body, encoding="utf-8")
+    return path
+
+
+class TestLoadRepoConfig:
+    def test_missing_config_returns_none(self, setup_dir):
+        assert config_utils.load_repo_config("nope") is None
+
+    def test_parses_front_matter(self, setup_dir):
+        write_config(setup_dir, "demo", "---\npath: /tmp/demo\nworkflows: [pr_review]\n---\n# Demo\n")
+
+        config = config_utils.load_repo_config("demo")
+        assert config == {"path": "/tmp/demo", "workflows": ["pr_review"]}
+
+    def test_repeat_loads_hit_cache(self, setup_dir):
+        write_config(setup_dir, "demo", "---\npath: /tmp/demo\n---\n")
+
+        config_utils.load_repo_config("demo")
+        config_utils.load_repo_config("demo")
+        info = config_utils._parse_config_file.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    def test_callers_get_independent_copies(self, setup_dir):
+        write_config(setup_dir, "demo", "---\npath: /tmp/demo\n---\n")
+
+        first = config_utils.load_repo_config("demo")
+        first["path"] = "mutated"
+        assert config_utils.load_repo_config("demo")["path"] == "/tmp/demo"
+
+    def test_modified_file_is_reparsed(self, setup_dir):
+        path = write_config(setup_dir, "demo", "---\npath: /tmp/old\n---\n")
+        assert config_utils.load_repo_config("demo")["path"] == "/tmp/old"
+
+        path.write_text("---\npath: /tmp/new-location\n---\n", encoding="utf-8")
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert config_utils.load_repo_config("demo")["path"] == "/tmp/new-location"
+
+    def test_save_then_load_roundtrip(self, setup_dir):
+        assert config_utils.save_repo_config("demo", {"path": "/tmp/demo", "main_branch": "main"})
+        assert config_utils.load_repo_config("demo")["main_branch"] == "main"
+
+
+class TestSplitFrontMatter:
+    def test_splits_config_and_body(self):
+        config, body = config_utils.split_front_matter("---\npath: /tmp/demo\n---\n# Demo\n")
+        assert config == {"path": "/tmp/demo"}
+        assert body == "# Demo\n"
+
+    def test_without_front_matter(self):
+        assert config_utils.split_front_matter("# Just notes\n") == ({}, "# Just notes\n")
+
+    def test_empty_front_matter_is_empty_dict(self):
+        assert config_utils.split_front_matter("---\n---\nbody") == ({}, "body")
+
+    def test_dashes_inside_values_do_not_split(self):
+        config, body = config_utils.split_front_matter("---\ntitle: a---b\n---\nbody")
+        assert config == {"title": "a---b"}
+        assert body == "body"
+
+    def test_unclosed_front_matter_is_treated_as_body(self):
+        content = "---\npath: x\n"
+        assert config_utils.split_front_matter(content) == ({}, content)
@@ -90,3 +90,31 @@ class TestDBManager:
         
         cached = db_manager.get_cache(diff_hash, prompt_hash, model)
         assert cached == "New Response"
+
+    def test_save_cache_many(self, db_path):
+        inserted = db_manager.save_cache_many([
+            {"diff_hash": "d1", "prompt_hash": "p1", "model": "m", "response": "R1", "repo_name": "bulk"},
+            {"diff_hash": "d2", "prompt_hash": "p2", "model": "m", "response": "R2", "repo_name": "bulk", "entry_type": "agent_session"},
+        ])
+        assert inserted == 2
+        assert db_manager.get_cache("d1", "p1", "m") == "R1"
+        assert db_manager.get_context("bulk", limit=5)[0]['response'] == "R2"
+
+    def test_connection_is_reused_in_wal_mode(self, db_path):
+        conn = db_manager.get_db_connection()
+        assert db_manager.get_db_connection() is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_save_cache_async(self, db_path):
+        db_manager.save_cache_async(diff_hash="a1", prompt_hash="p1", model="m", response="Async Resp")
+        db_manager.flush_writes()
+        assert db_manager.get_cache("a1", "p1", "m") == "Async Resp"
+
+    def test_save_cache_many_async(self, db_path):
+        db_manager.save_cache_many_async([
+            {"diff_hash": "b1", "prompt_hash": "r1", "model": "m", "response": "Recipe 1"},
+            {"diff_hash": "b1", "prompt_hash": "r2", "model": "m", "response": "Recipe 2"},
+        ])
+        db_manager.flush_writes()
+        assert db_manager.get_cache("b1", "r1", "m") == "Recipe 1"
+        assert db_manager.get_cache("b1", "r2", "m") == "Recipe 2"
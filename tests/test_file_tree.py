@@ -0,0 +1,42 @@
+"""Tests for the cockpit file tree component."""
+
+import subprocess
+
+import pytest
+from scripts import ui_utils
+from cockpit.components import file_tree
+
+
+@pytest.fixture
+def diverged_repo(tmp_path):
+    """main and feat each add a file on top of a shared base commit."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    def git(*args):
+        return subprocess.run(["git", "-C", str(repo), *args], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    git("init", "-q", "-b", "main")
+    git("config", "user.email", "t@example.com")
+    git("config", "user.name", "t")
+    (repo / "base.txt").write_text("base\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "base")
+    git("checkout", "-q", "-b", "feat")
+    (repo / "feat.txt").write_text("feat\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "feat")
+    git("checkout", "-q", "main")
+    (repo / "main.txt").write_text("main\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "main")
+    return repo, git("rev-parse", "main"), git("rev-parse", "feat")
+
+
+def test_content_filter_matches_changed_files_for_picked_commits(diverged_repo):
+    """Picked commits compare directly (..), so main's change must not be dropped."""
+    repo, main_sha, feat_sha = diverged_repo
+    args = (str(repo), "main", "feat", main_sha, feat_sha)
+
+    changed = ui_utils.get_changed_files(*args)
+    assert sorted(changed) == ["feat.txt", "main.txt"]
+    assert file_tree._content_changed_files(*args, "state") == set(changed)
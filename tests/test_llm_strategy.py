@@ -20,6 +20,13 @@ class TestLLMProviderInterface:
         with pytest.raises(TypeError):
             LLMProvider()
 
+    def test_default_stream_yields_whole_response(self):
+        """Providers without a streaming API yield call()'s result once."""
+        provider = ManualCopilotProvider()
+        provider.call = lambda prompt, **kwargs: f"echo: {prompt}"
+        assert list(provider.stream("hi")) == ["echo: hi"]
+        assert provider.supports_streaming is False
+
 
 class TestGeminiProvider:
     """Test Gemini API provider."""
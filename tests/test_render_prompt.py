@@ -1,7 +1,9 @@
 import pytest
 import sys
 import os
-from scripts.render_prompt import render_template, detect_languages
+import hashlib
+from scripts.render_prompt import (render_template, detect_languages, bind_output_dir,
+                                   OUTPUT_DIR_PLACEHOLDER, REPO_ROOT)
 
 class TestRenderPrompt:
     def test_detect_languages(self):
@@ -59,3 +61,32 @@ class TestRenderPrompt:
         
         result = render_template(str(template_file), diff_content, env_vars=env)
         assert "Format: json" in result
+
+    def test_edited_template_is_recompiled(self, tmp_path):
+        template_file = tmp_path / "template.md"
+        template_file.write_text("v1 {{ REPO_NAME }}")
+        assert render_template(str(template_file), "", repo_name="r") == "v1 r"
+
+        template_file.write_text("v2 {{ REPO_NAME }}")
+        st = template_file.stat()
+        os.utime(template_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert render_template(str(template_file), "", repo_name="r") == "v2 r"
+
+    def test_cache_key_stable_across_runs(self):
+        """Two identical cockpit runs hash to the same key; only the bound prompt names the run folder."""
+        recipe = os.path.join(REPO_ROOT, "prompts", "recipes", "standard_pr_review.md")
+        diff_content = "diff --git a/script.py b/script.py\n+ print('hello')"
+
+        def run(out_folder):
+            rendered = render_template(recipe, diff_content, repo_name="r", inject_diff_content=False,
+                                       OUTPUT_DIR=OUTPUT_DIR_PLACEHOLDER)
+            key = hashlib.blake2b(rendered.encode(), digest_size=16).hexdigest()
+            return key, bind_output_dir(rendered, out_folder)
+
+        key1, prompt1 = run("output/20260101T000000-r-review")
+        key2, prompt2 = run("output/20260101T000100-r-review")
+
+        assert key1 == key2
+        assert "output/20260101T000000-r-review" in prompt1
+        assert "output/20260101T000100-r-review" in prompt2
+        assert OUTPUT_DIR_PLACEHOLDER not in prompt1
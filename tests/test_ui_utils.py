@@ -0,0 +1,182 @@
+"""Tests for the Streamlit UI helper functions in ui_utils."""
+
+import os
+import pytest
+from unittest.mock import patch
+from scripts import ui_utils
+
+
+class TestListRepositories:
+    def test_lists_repo_configs(self, tmp_path, monkeypatch):
+        setup_dir = tmp_path / "repository-setup"
+        setup_dir.mkdir()
+        for name in ["beta.md", "alpha.md", "TEMPLATE.md", "README.md", ".hidden.md", "notes.txt"]:
+            (setup_dir / name).write_text("---\n---\n")
+        (setup_dir / "examples").mkdir()
+        monkeypatch.chdir(tmp_path)
+
+        assert ui_utils.list_repositories() == ["alpha", "beta"]
+
+    def test_missing_setup_dir(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert ui_utils.list_repositories() == []
+
+
+class TestListPromptLibrary:
+    def test_reads_front_matter(self, tmp_path, monkeypatch):
+        recipes = tmp_path / "prompts" / "recipes"
+        recipes.mkdir(parents=True)
+        (recipes / "review.md").write_text("---\ndescription: Review it\ntags: [a, b]\n---\nBody\n")
+        (tmp_path / "prompts" / "plain.md").write_text("No front matter\n")
+        monkeypatch.chdir(tmp_path)
+
+        library = ui_utils.list_prompt_library()
+        assert [item["name"] for item in library] == ["plain.md", "recipes/review.md"]
+        assert library[0]["description"] is None
+        assert library[1]["description"] == "Review it"
+        assert library[1]["tags"] == ["a", "b"]
+
+
+class TestGetRepoState:
+    @pytest.fixture
+    def repo(self, tmp_path):
+        import subprocess
+        def git(*args):
+            subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+        git("init", "-q")
+        git("config", "user.email", "t@example.com")
+        git("config", "user.name", "t")
+        (tmp_path / "a.txt").write_text("one\n")
+        git("add", "a.txt")
+        git("commit", "-q", "-m", "init")
+        return tmp_path
+
+    def test_stable_without_changes(self, repo):
+        assert ui_utils.get_repo_state(str(repo), include_worktree=True) == \
+            ui_utils.get_repo_state(str(repo), include_worktree=True)
+
+    def test_worktree_edit_changes_state(self, repo):
+        before = ui_utils.get_repo_state(str(repo), include_worktree=True)
+        (repo / "a.txt").write_text("two\n")
+        assert ui_utils.get_repo_state(str(repo), include_worktree=True) != before
+
+    def test_refs_state_tracks_branch_changes(self, repo):
+        import subprocess
+        def git(*args):
+            subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+        initial = ui_utils.get_refs_state(str(repo))
+        assert ui_utils.get_refs_state(str(repo)) == initial
+
+        git("branch", "feature/x")
+        created = ui_utils.get_refs_state(str(repo))
+        assert created != initial
+
+        git("branch", "-D", "feature/x")
+        assert ui_utils.get_refs_state(str(repo)) != created
+
+    def test_diff_numstat_totals(self, repo):
+        (repo / "a.txt").write_text("two\nthree\n")
+        assert ui_utils.get_diff_numstat(str(repo), "HEAD", "Working Directory") == (2, 1)
+
+    def test_changed_files_keeps_unusual_paths(self, repo):
+        import subprocess
+        (repo / "naïve name.txt").write_text("x\n")
+        subprocess.run(["git", "-C", str(repo), "add", "."], check=True)
+        (repo / "a.txt").write_text("two\n")
+        assert sorted(ui_utils.get_changed_files(str(repo), "HEAD", "Working Directory")) == ["a.txt", "naïve name.txt"]
+
+    def test_get_commits_parses_records(self, repo):
+        commits = ui_utils.get_commits(str(repo), "HEAD")
+        assert len(commits) == 1
+        assert commits[0]["message"] == "init"
+        assert commits[0]["author"] == "t"
+        assert len(commits[0]["date"]) == 10
+
+    def test_get_file_versions(self, repo):
+        (repo / "a.txt").write_text("two\r\n")
+        assert ui_utils.get_file_versions(str(repo), ["HEAD", None], "a.txt") == ["one\n", "two\n"]
+        assert ui_utils.get_file_versions(str(repo), ["HEAD", "HEAD"], "missing.txt") == ["", ""]
+
+    def test_get_blobs_mixed_missing(self, repo):
+        assert ui_utils.get_blobs(str(repo), ["HEAD:nope", "HEAD:a.txt", "HEAD:"]) == ["", "one\n", ""]
+
+    def test_get_blobs_binary_is_empty(self, repo):
+        import subprocess
+        (repo / "img.bin").write_bytes(b"\x89PNG\x00\x01")
+        (repo / "latin1.txt").write_bytes(b"caf\xe9\n")
+        subprocess.run(["git", "-C", str(repo), "add", "."], check=True)
+        subprocess.run(["git", "-C", str(repo), "commit", "-q", "-m", "binary"], check=True)
+        assert ui_utils.get_blobs(str(repo), ["HEAD:img.bin", "HEAD:latin1.txt", "HEAD:a.txt"]) == ["", "", "one\n"]
+
+    def test_is_git_repo(self, repo, tmp_path_factory):
+        assert ui_utils.is_git_repo(str(repo))
+        (repo / "sub").mkdir()
+        assert ui_utils.is_git_repo(str(repo / "sub"))
+        assert not ui_utils.is_git_repo(str(tmp_path_factory.mktemp("plain")))
+
+
+class TestCommitDiffCache:
+    @pytest.fixture
+    def repo(self, tmp_path, monkeypatch):
+        import subprocess
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        def git(*args):
+            subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+        git("init", "-q")
+        git("config", "user.email", "t@example.com")
+        git("config", "user.name", "t")
+        (repo / "a.txt").write_text("one\n")
+        git("add", "a.txt")
+        git("commit", "-q", "-m", "init")
+        git("tag", "base")
+        (repo / "a.txt").write_text("two\n")
+        git("commit", "-q", "-am", "change")
+        monkeypatch.setattr(ui_utils, "DIFF_CACHE_DIR", str(tmp_path / "diff_cache"))
+        ui_utils._commit_diff.cache_clear()
+        yield repo
+        ui_utils._commit_diff.cache_clear()
+
+    def test_commit_diff_is_persisted(self, repo, tmp_path):
+        diff = ui_utils.get_diff(str(repo), "base", "HEAD", target_commit="base")
+        assert "+two" in diff
+        assert len(list((tmp_path / "diff_cache").glob("*.patch.gz"))) == 1
+
+        # With the in-memory cache cleared, the patch comes back from disk
+        base_sha, head_sha = ui_utils._resolve_shas(str(repo), "base", "HEAD")
+        ui_utils._commit_diff.cache_clear()
+        with patch("scripts.ui_utils.subprocess.run", side_effect=AssertionError("git called")):
+            assert ui_utils._commit_diff(str(repo), base_sha, "..", head_sha) == diff
+
+    def test_file_diff_not_persisted(self, repo, tmp_path):
+        diff = ui_utils.get_diff(str(repo), "base", "HEAD", file_path="a.txt", target_commit="base")
+        assert "+two" in diff
+        assert not (tmp_path / "diff_cache").exists()
+
+    def test_least_recently_used_patches_evicted(self, repo, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "diff_cache"
+        cache_dir.mkdir()
+        for i, name in enumerate(["old", "recent"]):
+            stale = cache_dir / f"{name}.patch.gz"
+            stale.write_bytes(b"x")
+            os.utime(stale, (1000 + i, 1000 + i))
+        monkeypatch.setattr(ui_utils, "DIFF_CACHE_MAX_FILES", 2)
+
+        ui_utils.get_diff(str(repo), "base", "HEAD", target_commit="base")
+
+        remaining = sorted(p.name for p in cache_dir.glob("*.patch.gz"))
+        assert len(remaining) == 2
+        assert "old.patch.gz" not in remaining
+        assert "recent.patch.gz" in remaining
+
+    def test_working_directory_not_cached(self, repo, tmp_path):
+        (repo / "a.txt").write_text("three\n")
+        assert "+three" in ui_utils.get_diff(str(repo), "HEAD", "Working Directory")
+        assert not (tmp_path / "diff_cache").exists()
+
+    def test_content_changed_files_ignore_line_endings(self, repo):
+        (repo / "a.txt").write_text("two\r\n")
+        (repo / "b.txt").write_text("new\n")
+        import subprocess
+        subprocess.run(["git", "-C", str(repo), "add", "b.txt"], check=True)
+        assert ui_utils.get_content_changed_files(str(repo), "HEAD", "Working Directory") == ["b.txt"]